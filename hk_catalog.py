@@ -0,0 +1,491 @@
+import os
+import socket
+import sqlite3
+import hashlib
+import argparse
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from hk_prompt_template import folder_variables
+
+
+DEFAULT_CATALOG_PATH = os.path.join("result", "catalog.sqlite3")
+
+# 파이프라인 단계별 상태
+STATUS_PENDING = "pending"  # [처리전] - 생성 대기
+STATUS_GENERATING = "generating"  # 생성 작업자가 가져감
+STATUS_GENERATED = "generated"  # [처리후] - 포스팅 대기
+STATUS_POSTING = "posting"  # 포스팅 작업자가 가져감
+STATUS_POSTED = "posted"  # 포스팅 완료
+STATUS_FAILED = "failed"
+STATUSES = (
+    STATUS_PENDING,
+    STATUS_GENERATING,
+    STATUS_GENERATED,
+    STATUS_POSTING,
+    STATUS_POSTED,
+    STATUS_FAILED,
+)
+# 작업을 가져갈 때의 상태 전환 (대기 상태 -> 진행 상태)
+CLAIM_TRANSITIONS = {
+    STATUS_PENDING: STATUS_GENERATING,
+    STATUS_GENERATED: STATUS_POSTING,
+}
+# 오래 끝나지 않은 작업을 되돌릴 때의 상태 전환 (진행 상태 -> 대기 상태)
+RECLAIM_TRANSITIONS = {v: k for k, v in CLAIM_TRANSITIONS.items()}
+# 가져간 뒤 이 시간(초)이 지나도록 끝나지 않은 작업은 작업자가 죽은 것으로 보고 되돌림
+DEFAULT_CLAIM_TIMEOUT = 2 * 60 * 60
+
+FOLDER_MARK_STATUSES = {"[처리전]": STATUS_PENDING, "[처리후]": STATUS_GENERATED}
+# 폴더 내용 해시에 사용하는 파일 (원문이 있으면 원문, 없으면 생성 결과)
+HASH_FILE_NAMES = ("content_with_images.txt", "output.md")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    region TEXT,
+    keyword TEXT,
+    content_hash TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    claimed_by TEXT,
+    claimed_at TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_folders_status_created ON folders (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_folders_region_status ON folders (region, status, created_at);
+CREATE INDEX IF NOT EXISTS idx_folders_created ON folders (created_at);
+CREATE INDEX IF NOT EXISTS idx_folders_content_hash ON folders (content_hash);
+"""
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class FolderCatalog:
+    """
+    작업 폴더의 파이프라인 상태를 기록하는 SQLite 카탈로그.
+
+    폴더 이름([처리전]/[처리후])을 훑지 않고도 상태·지역·생성일·내용 해시 인덱스로
+    작업을 조회하거나 가져갈(claim) 수 있습니다. 모든 변경은 트랜잭션으로 처리됩니다.
+
+    Args:
+        db_path (str): SQLite 파일 경로
+    """
+
+    def __init__(self, db_path=DEFAULT_CATALOG_PATH):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        # isolation_level=None: 트랜잭션을 transaction() 에서 직접 관리
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    @contextmanager
+    def transaction(self):
+        """
+        BEGIN IMMEDIATE 로 쓰기 잠금을 먼저 잡아 여러 작업자가 같은 행을 가져가지 않도록 합니다.
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def upsert_folder(self, path, status, region=None, keyword=None, content_hash=None, created_at=None):
+        """
+        폴더를 등록하거나 상태/메타데이터를 갱신합니다.
+
+        이미 진행 중이거나 포스팅/실패로 기록된 폴더는 폴더 이름만으로 알 수 없는 상태이므로
+        상태를 덮어쓰지 않습니다.
+        """
+        path = os.path.abspath(path)
+        now = _now()
+        with self.transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO folders (path, name, status, region, keyword, content_hash, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    status = CASE WHEN folders.status IN (?, ?)
+                        THEN excluded.status ELSE folders.status END,
+                    region = COALESCE(excluded.region, folders.region),
+                    keyword = COALESCE(excluded.keyword, folders.keyword),
+                    content_hash = COALESCE(excluded.content_hash, folders.content_hash),
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    path,
+                    os.path.basename(path),
+                    status,
+                    region,
+                    keyword,
+                    content_hash,
+                    created_at or now,
+                    now,
+                    STATUS_PENDING,
+                    STATUS_GENERATED,
+                ),
+            )
+
+    def record_transition(self, old_path, new_path, status, content_hash=None, error=None):
+        """
+        단계가 끝난 폴더의 경로(이름 변경 포함)와 상태를 한 트랜잭션으로 갱신합니다.
+        등록되지 않은 폴더라면 새로 등록합니다.
+        """
+        old_path = os.path.abspath(old_path)
+        new_path = os.path.abspath(new_path)
+        now = _now()
+        with self.transaction() as conn:
+            updated = conn.execute(
+                """
+                UPDATE folders SET
+                    path = ?, name = ?, status = ?,
+                    content_hash = COALESCE(?, content_hash),
+                    error = ?, claimed_by = NULL, claimed_at = NULL, updated_at = ?
+                WHERE path = ?
+                """,
+                (
+                    new_path,
+                    os.path.basename(new_path),
+                    status,
+                    content_hash,
+                    error,
+                    now,
+                    old_path,
+                ),
+            ).rowcount
+            if not updated:
+                region, keyword = parse_folder_name(os.path.basename(new_path))
+                conn.execute(
+                    """
+                    INSERT INTO folders (path, name, status, region, keyword, content_hash, created_at, updated_at, error)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        new_path,
+                        os.path.basename(new_path),
+                        status,
+                        region,
+                        keyword,
+                        content_hash,
+                        now,
+                        now,
+                        error,
+                    ),
+                )
+
+    def _reclaim(self, conn, in_progress, older_than):
+        cutoff = (datetime.now() - timedelta(seconds=older_than)).isoformat(timespec="seconds")
+        return conn.execute(
+            """
+            UPDATE folders SET
+                status = ?, error = '오래된 작업 회수: ' || COALESCE(claimed_by, '?'),
+                claimed_by = NULL, claimed_at = NULL, updated_at = ?
+            WHERE status = ? AND (claimed_at IS NULL OR claimed_at < ?)
+            """,
+            (RECLAIM_TRANSITIONS[in_progress], _now(), in_progress, cutoff),
+        ).rowcount
+
+    def reclaim_stale(self, older_than=DEFAULT_CLAIM_TIMEOUT, status=None):
+        """
+        진행 상태로 older_than 초 넘게 남아 있는 폴더를 대기 상태로 되돌립니다.
+        (작업자가 비정상 종료하여 남은 generating/posting 행 정리용)
+
+        Args:
+            older_than (float): 가져간 뒤 지난 시간(초)
+            status (str, optional): 되돌릴 진행 상태. 없으면 모든 진행 상태
+
+        Returns:
+            int: 되돌린 폴더 수
+        """
+        statuses = [status] if status else list(RECLAIM_TRANSITIONS)
+        with self.transaction() as conn:
+            return sum(self._reclaim(conn, in_progress, older_than) for in_progress in statuses)
+
+    def claim(
+        self,
+        status=STATUS_PENDING,
+        worker=None,
+        region=None,
+        limit=1,
+        stale_after=DEFAULT_CLAIM_TIMEOUT,
+    ):
+        """
+        대기 상태의 폴더를 오래된 순으로 가져가고 진행 상태로 바꿉니다.
+
+        stale_after 초 넘게 끝나지 않은 같은 단계의 작업은 먼저 대기 상태로 되돌려 다시 가져갈 수
+        있게 합니다. (None 이면 되돌리지 않음)
+        (status, created_at) 인덱스를 사용하므로 폴더 수와 관계없이 O(log n) 입니다.
+
+        Returns:
+            list: 가져간 폴더 행(dict) 목록
+        """
+        if status not in CLAIM_TRANSITIONS:
+            raise ValueError(f"가져갈 수 없는 상태입니다: {status}")
+        worker = worker or default_worker_id()
+        query = "SELECT * FROM folders WHERE status = ?"
+        params = [status]
+        if region:
+            query += " AND region = ?"
+            params.append(region)
+        query += " ORDER BY created_at, id LIMIT ?"
+        params.append(limit)
+
+        now = _now()
+        with self.transaction() as conn:
+            if stale_after is not None:
+                reclaimed = self._reclaim(conn, CLAIM_TRANSITIONS[status], stale_after)
+                if reclaimed:
+                    print(f"끝나지 않은 작업 {reclaimed}개를 대기 상태로 되돌렸습니다.")
+            rows = conn.execute(query, params).fetchall()
+            conn.executemany(
+                """
+                UPDATE folders SET status = ?, claimed_by = ?, claimed_at = ?, updated_at = ?
+                WHERE id = ?
+                """,
+                [(CLAIM_TRANSITIONS[status], worker, now, now, row["id"]) for row in rows],
+            )
+        return [
+            dict(row, status=CLAIM_TRANSITIONS[status], claimed_by=worker, claimed_at=now)
+            for row in rows
+        ]
+
+    def heartbeat(self, paths, in_progress):
+        """
+        아직 진행 상태(in_progress)인 폴더의 claimed_at 을 지금으로 갱신합니다.
+        (배치 결과처럼 오래 기다리는 작업이 다른 작업자에게 회수되지 않도록 함)
+
+        Returns:
+            int: 갱신한 폴더 수
+        """
+        now = _now()
+        with self.transaction() as conn:
+            return sum(
+                conn.execute(
+                    "UPDATE folders SET claimed_at = ?, updated_at = ? WHERE path = ? AND status = ?",
+                    (now, now, os.path.abspath(path), in_progress),
+                ).rowcount
+                for path in paths
+            )
+
+    def release(self, path, status, error=None):
+        """
+        가져간 폴더를 지정한 상태로 되돌립니다. (실패 처리나 재시도용)
+        """
+        with self.transaction() as conn:
+            conn.execute(
+                """
+                UPDATE folders SET status = ?, error = ?, claimed_by = NULL, claimed_at = NULL, updated_at = ?
+                WHERE path = ?
+                """,
+                (status, error, _now(), os.path.abspath(path)),
+            )
+
+    def release_unfinished(self, paths, status, in_progress, error=None):
+        """
+        가져간 폴더 중 아직 진행 상태(in_progress)로 남은 것만 status 로 되돌립니다.
+        (이미 완료/실패로 기록된 폴더는 그대로 둠)
+
+        Returns:
+            int: 되돌린 폴더 수
+        """
+        now = _now()
+        with self.transaction() as conn:
+            return sum(
+                conn.execute(
+                    """
+                    UPDATE folders SET status = ?, error = ?, claimed_by = NULL, claimed_at = NULL, updated_at = ?
+                    WHERE path = ? AND status = ?
+                    """,
+                    (status, error, now, os.path.abspath(path), in_progress),
+                ).rowcount
+                for path in paths
+            )
+
+    def query(self, status=None, region=None, since=None, content_hash=None, limit=100):
+        """
+        조건에 맞는 폴더를 생성일 순으로 반환합니다.
+        """
+        clauses = []
+        params = []
+        for column, value in (("status", status), ("region", region), ("content_hash", content_hash)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        sql = "SELECT * FROM folders"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at, id LIMIT ?"
+        params.append(limit)
+        return self.conn.execute(sql, params).fetchall()
+
+    def stats(self):
+        """
+        상태별 폴더 수를 반환합니다.
+        """
+        rows = self.conn.execute(
+            "SELECT status, COUNT(*) AS count FROM folders GROUP BY status"
+        ).fetchall()
+        return {row["status"]: row["count"] for row in rows}
+
+
+def parse_folder_name(folder_name):
+    """
+    폴더 이름에서 (지역, 키워드) 를 추출합니다. 형식이 맞지 않으면 (None, None).
+    """
+    variables = folder_variables(folder_name)
+    return variables.get("city") or None, variables.get("keyword")
+
+
+def folder_content_hash(folder_path):
+    """
+    폴더의 원문(없으면 생성 결과) 파일 내용으로 sha1 해시를 계산합니다.
+    """
+    for file_name in HASH_FILE_NAMES:
+        file_path = os.path.join(folder_path, file_name)
+        if os.path.exists(file_path):
+            digest = hashlib.sha1()
+            with open(file_path, "rb") as f:
+                for chunk in iter(lambda: f.read(64 * 1024), b""):
+                    digest.update(chunk)
+            return digest.hexdigest()
+    return None
+
+
+def migrate_from_folders(catalog, base_dir="."):
+    """
+    기존 폴더 이름의 [처리전]/[처리후] 표시를 읽어 카탈로그에 등록합니다.
+    이미 등록된 폴더는 상태와 메타데이터만 갱신합니다. (여러 번 실행해도 안전)
+
+    Returns:
+        int: 등록/갱신한 폴더 수
+    """
+    count = 0
+    for entry in sorted(os.scandir(base_dir), key=lambda e: e.name):
+        if not entry.is_dir():
+            continue
+        status = next(
+            (s for mark, s in FOLDER_MARK_STATUSES.items() if mark in entry.name), None
+        )
+        if status is None:
+            continue
+        region, keyword = parse_folder_name(entry.name)
+        created_at = datetime.fromtimestamp(entry.stat().st_mtime).isoformat(timespec="seconds")
+        catalog.upsert_folder(
+            entry.path,
+            status,
+            region=region,
+            keyword=keyword,
+            content_hash=folder_content_hash(entry.path),
+            created_at=created_at,
+        )
+        count += 1
+    print(f"폴더 {count}개를 카탈로그에 반영했습니다: {catalog.db_path}")
+    return count
+
+
+def _print_rows(rows):
+    for row in rows:
+        claimed = f" ({row['claimed_by']})" if row["claimed_by"] else ""
+        print(
+            f"{row['status']:<10} {row['created_at']}  [{row['region'] or '-'}] "
+            f"{row['keyword'] or '-'}  {row['path']}{claimed}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="작업 폴더 카탈로그 관리")
+    parser.add_argument(
+        "--db", type=str, default=DEFAULT_CATALOG_PATH, help="카탈로그 파일 경로"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="기존 폴더 이름으로부터 카탈로그 생성/갱신")
+    migrate_parser.add_argument("--base_dir", type=str, default=".", help="작업 폴더가 있는 디렉토리")
+
+    list_parser = subparsers.add_parser("list", help="조건에 맞는 폴더 조회")
+    list_parser.add_argument("--status", type=str, choices=STATUSES, default=None)
+    list_parser.add_argument("--region", type=str, default=None)
+    list_parser.add_argument("--since", type=str, default=None, help="생성일 하한 (YYYY-MM-DD)")
+    list_parser.add_argument("--hash", type=str, default=None, help="내용 해시")
+    list_parser.add_argument("--limit", type=int, default=100)
+
+    claim_parser = subparsers.add_parser("claim", help="대기 중인 폴더를 가져감")
+    claim_parser.add_argument(
+        "--status", type=str, choices=tuple(CLAIM_TRANSITIONS), default=STATUS_PENDING
+    )
+    claim_parser.add_argument("--region", type=str, default=None)
+    claim_parser.add_argument("--worker", type=str, default=None)
+    claim_parser.add_argument("--limit", type=int, default=1)
+    claim_parser.add_argument(
+        "--stale_after",
+        type=float,
+        default=DEFAULT_CLAIM_TIMEOUT,
+        help="이 시간(초)이 지나도록 끝나지 않은 작업은 먼저 대기 상태로 되돌림",
+    )
+
+    reclaim_parser = subparsers.add_parser(
+        "reclaim", help="오래 끝나지 않은 generating/posting 폴더를 대기 상태로 되돌림"
+    )
+    reclaim_parser.add_argument(
+        "--older_than", type=float, default=DEFAULT_CLAIM_TIMEOUT, help="가져간 뒤 지난 시간(초)"
+    )
+    reclaim_parser.add_argument(
+        "--status", type=str, choices=tuple(RECLAIM_TRANSITIONS), default=None
+    )
+
+    release_parser = subparsers.add_parser("release", help="폴더 상태를 지정한 값으로 되돌림")
+    release_parser.add_argument("path", type=str)
+    release_parser.add_argument("--status", type=str, choices=STATUSES, default=STATUS_PENDING)
+
+    subparsers.add_parser("stats", help="상태별 폴더 수")
+    args = parser.parse_args()
+
+    with FolderCatalog(args.db) as catalog:
+        if args.command == "migrate":
+            migrate_from_folders(catalog, args.base_dir)
+        elif args.command == "list":
+            _print_rows(catalog.query(args.status, args.region, args.since, args.hash, args.limit))
+        elif args.command == "claim":
+            _print_rows(
+                catalog.claim(args.status, args.worker, args.region, args.limit, args.stale_after)
+            )
+        elif args.command == "reclaim":
+            count = catalog.reclaim_stale(args.older_than, args.status)
+            print(f"{count}개 폴더를 대기 상태로 되돌렸습니다.")
+        elif args.command == "release":
+            catalog.release(args.path, args.status)
+        elif args.command == "stats":
+            for status, count in sorted(catalog.stats().items()):
+                print(f"{status:<10} {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+
+# 원문/생성 결과의 이미지 자리표시자
+# - downloadBlog.js 원문: [이미지: image_001.png] (뒤에 [이미지 경로: ...], [원본 URL: ...] 줄이 따라옴)
+# - 생성 결과 / hk_write_blog 입력: {image_001.png}
+IMAGE_PLACEHOLDER_PATTERN = re.compile(
+    r"\{image_\d+\.[A-Za-z]+\}|\[이미지: [^\]]+\]"
+)
+# 자리표시자 바로 뒤에 붙는 부가 정보 줄
+IMAGE_DETAIL_PATTERN = re.compile(r"^\[(?:이미지 경로|원본 URL): .*\]$")
+
+DEFAULT_MIN_SECTION_CHARS = 300
+
+
+class SectionGenerationError(Exception):
+    """
+    재시도 후에도 검증을 통과하지 못한 구간이 남은 경우 발생합니다.
+    """
+
+
+def split_sections_with_separators(source, min_section_chars=DEFAULT_MIN_SECTION_CHARS):
+    """
+    원문을 이미지 자리표시자 단위로 나누고, 구간 사이의 원래 구분 문자열(줄바꿈/빈 줄)도 함께
+    반환합니다. 각 구간은 자리표시자(와 부가 정보 줄)로 끝나며 마지막 구간은 자리표시자 없이
+    끝날 수 있습니다. 너무 짧은 구간은 원래 구분 문자열 그대로 다음 구간과 합칩니다.
+
+    Returns:
+        tuple: (구간 텍스트 목록 (앞뒤 줄바꿈 제거), 구간 사이 구분 문자열 목록 (구간 수 - 1개))
+    """
+    # 원문을 줄 단위로 자른 구간의 시작/끝 위치 (빈 줄만 있는 구간은 구분 문자열에 포함)
+    spans = []
+    lines = source.split("\n")
+    position = 0
+    chunk_start = 0
+    for i, line in enumerate(lines):
+        position += len(line)
+        is_last = i + 1 == len(lines)
+        if not is_last and not (
+            IMAGE_PLACEHOLDER_PATTERN.search(line) or IMAGE_DETAIL_PATTERN.match(line.strip())
+        ):
+            position += 1
+            continue
+        # 자리표시자의 부가 정보 줄이 이어지면 같은 구간에 포함
+        next_line = lines[i + 1].strip() if not is_last else ""
+        if IMAGE_DETAIL_PATTERN.match(next_line):
+            position += 1
+            continue
+        chunk = source[chunk_start:position]
+        if chunk.strip():
+            start = chunk_start + len(chunk) - len(chunk.lstrip("\n"))
+            spans.append((start, chunk_start + len(chunk.rstrip("\n"))))
+        position += 1
+        chunk_start = position
+
+    sections = [source[start:end] for start, end in spans]
+    separators = [source[spans[i][1]:spans[i + 1][0]] for i in range(len(spans) - 1)]
+
+    merged = []
+    merged_separators = []
+    for i, section in enumerate(sections):
+        if merged and len(merged[-1]) < min_section_chars:
+            merged[-1] = merged[-1] + separators[i - 1] + section
+        else:
+            if merged:
+                merged_separators.append(separators[i - 1])
+            merged.append(section)
+    return merged, merged_separators
+
+
+def split_sections(source, min_section_chars=DEFAULT_MIN_SECTION_CHARS):
+    """
+    원문을 이미지 자리표시자 단위로 나눕니다. (split_sections_with_separators 참고)
+
+    Returns:
+        list: 구간 텍스트 목록 (앞뒤 줄바꿈 제거)
+    """
+    return split_sections_with_separators(source, min_section_chars)[0]
+
+
+def extract_placeholders(text):
+    """
+    텍스트에 나오는 이미지 파일 이름을 순서대로 반환합니다. (두 자리표시자 형식을 같은 것으로 취급)
+    """
+    names = []
+    for match in IMAGE_PLACEHOLDER_PATTERN.finditer(text):
+        token = match.group(0)
+        if token.startswith("{"):
+            names.append(token[1:-1])
+        else:
+            names.append(token[len("[이미지: "):-1].strip())
+    return names
+
+
+def count_lines(text):
+    """
+    자리표시자 부가 정보 줄을 제외한, 내용이 있는 줄 수를 반환합니다.
+    """
+    return sum(
+        1
+        for line in text.splitlines()
+        if line.strip() and not IMAGE_DETAIL_PATTERN.match(line.strip())
+    )
+
+
+def validate_section(source_section, generated_section, line_tolerance=0):
+    """
+    생성된 구간이 원문 구간의 자리표시자 순서와 줄 수를 유지하는지 확인합니다.
+
+    Returns:
+        str: 문제가 있으면 이유, 없으면 None
+    """
+    if not generated_section or not generated_section.strip():
+        return "빈 응답"
+    expected = extract_placeholders(source_section)
+    actual = extract_placeholders(generated_section)
+    if expected != actual:
+        return f"이미지 자리표시자 불일치 (원문 {expected}, 생성 {actual})"
+    expected_lines = count_lines(source_section)
+    actual_lines = count_lines(generated_section)
+    if abs(expected_lines - actual_lines) > line_tolerance:
+        return f"줄 수 불일치 (원문 {expected_lines}줄, 생성 {actual_lines}줄)"
+    return None
+
+
+def generate_in_sections(
+    source,
+    request_fn,
+    max_workers=4,
+    max_attempts=3,
+    min_section_chars=DEFAULT_MIN_SECTION_CHARS,
+    line_tolerance=0,
+):
+    """
+    원문을 구간으로 나눠 동시에 생성하고, 검증에 실패한 구간만 다시 생성한 뒤 원문의 구분 문자열로
+    순서대로 합칩니다.
+
+    Args:
+        source (str): 원문
+        request_fn (callable): (구간 텍스트, 구간 번호(1부터), 전체 구간 수) 를 받아 생성 결과를 반환
+        max_workers (int): 동시에 생성할 구간 수
+        max_attempts (int): 구간별 최대 시도 횟수
+        min_section_chars (int): 이보다 짧은 구간은 다음 구간과 합침
+        line_tolerance (int): 허용할 줄 수 차이
+
+    Returns:
+        str: 구간별 생성 결과를 합친 본문
+
+    Raises:
+        SectionGenerationError: 최대 시도 후에도 실패한 구간이 있는 경우
+    """
+    sections, separators = split_sections_with_separators(source, min_section_chars)
+    total = len(sections)
+    results = [None] * total
+    failures = {}
+    remaining = list(range(total))
+    print(f"원문을 {total}개 구간으로 나누어 생성합니다.")
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total))) as executor:
+        for attempt in range(1, max_attempts + 1):
+            if not remaining:
+                break
+            futures = {
+                index: executor.submit(request_fn, sections[index], index + 1, total)
+                for index in remaining
+            }
+            retry = []
+            for index, future in futures.items():
+                try:
+                    generated = future.result()
+                    problem = validate_section(sections[index], generated, line_tolerance)
+                except Exception as e:
+                    problem = f"요청 실패: {e}"
+                if problem is None:
+                    results[index] = generated.strip("\n")
+                    failures.pop(index, None)
+                else:
+                    failures[index] = problem
+                    retry.append(index)
+                    print(f"구간 {index + 1}/{total} 검증 실패 (시도 {attempt}/{max_attempts}): {problem}")
+            remaining = retry
+
+    if remaining:
+        detail = ", ".join(f"{index + 1}번({failures[index]})" for index in remaining)
+        raise SectionGenerationError(f"구간 생성 실패: {detail}")
+    content = results[0] if results else ""
+    for separator, result in zip(separators, results[1:]):
+        content += separator + result
+    return content
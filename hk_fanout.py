@@ -0,0 +1,307 @@
+import os
+import re
+import random
+import shutil
+import argparse
+import tempfile
+
+import pandas as pd  # 엑셀 파일 처리를 위해 pandas 사용
+
+from hk_catalog import FolderCatalog, STATUS_GENERATED, folder_content_hash
+from hk_post_diff import PUBLISHED_RECORD_NAME
+from hk_prompt_template import DEFAULT_VARIABLES, STATUS_MARK_PATTERN, folder_variables
+
+
+DOCS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "docs")
+DEFAULT_REGION_PATH = os.path.join(DOCS_DIR, "region.xlsx")
+DEFAULT_MAP_PATH = os.path.join(DOCS_DIR, "map.xlsx")
+
+# 지역별로 그대로 복사하지 않고 다시 쓰는 파일
+TEXT_FILE_NAMES = ("output.md", "content_with_images_processed.txt", "title.txt")
+# 지역별 변형본에 복사하지 않는 파일 (원문/중간 산출물, 원본 글의 발행 기록)
+SKIP_FILE_NAMES = ("content_with_images.txt", "original_content.html", PUBLISHED_RECORD_NAME)
+# 내용이 바뀌지 않아 하드링크로 공유해도 되는 파일
+LINKABLE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+
+# 가벼운 표현 바꾸기 규칙 (원래 표현, 바꿀 표현 후보)
+PARAPHRASE_RULES = (
+    ("빠르게", ("신속하게", "빠르게")),
+    ("정확하게", ("꼼꼼하게", "정확하게")),
+    ("확인했습니다", ("점검했습니다", "살펴보았습니다")),
+    ("해결했습니다", ("해결해 드렸습니다", "마무리했습니다")),
+    ("많은 분들", ("여러 고객님들", "많은 분들")),
+    ("정말", ("참", "정말")),
+    ("깔끔하게", ("말끔하게", "깔끔하게")),
+)
+# 이미지 자리표시자는 표현 바꾸기 대상에서 제외
+PLACEHOLDER_PATTERN = re.compile(r"\{[^}]*\}")
+
+
+def load_target_regions(region_path=DEFAULT_REGION_PATH, source_city=None):
+    """
+    region.xlsx 의 '변경' 열에서 대상 지역 목록을 읽습니다.
+
+    '기존' 열에 source_city 와 같은 행이 있으면 그 행들만 사용하고, 없으면 모든 행을 사용합니다.
+    """
+    df = pd.read_excel(region_path)
+    if "변경" not in df.columns:
+        raise ValueError(f"'{region_path}' 에 '변경' 열이 없습니다: {df.columns.tolist()}")
+    if source_city and "기존" in df.columns:
+        matching = df[df["기존"].astype(str).str.strip() == source_city]
+        if not matching.empty:
+            df = matching
+    regions = []
+    for value in df["변경"].dropna().astype(str):
+        value = value.strip()
+        if value and value not in regions and value != source_city:
+            regions.append(value)
+    return regions
+
+
+def load_region_addresses(map_path=DEFAULT_MAP_PATH):
+    """
+    map.xlsx 의 '지역' -> '주소' 매핑을 읽습니다. 파일이 없으면 빈 dict 를 반환합니다.
+    """
+    if not os.path.exists(map_path):
+        print(f"엑셀 파일을 찾을 수 없습니다: {map_path}")
+        return {}
+    df = pd.read_excel(map_path)
+    addresses = {}
+    for _, row in df.iterrows():
+        region = str(row.get("지역", "")).strip()
+        address = row.get("주소")
+        if region and region != "nan" and isinstance(address, str) and region not in addresses:
+            addresses[region] = address.strip()
+    return addresses
+
+
+def paraphrase(text, seed):
+    """
+    PARAPHRASE_RULES 에 따라 표현 일부를 바꿉니다. 같은 seed 면 항상 같은 결과입니다.
+    """
+    rng = random.Random(seed)
+    parts = PLACEHOLDER_PATTERN.split(text)
+    placeholders = PLACEHOLDER_PATTERN.findall(text)
+
+    def replace(match):
+        candidates = replacements[match.group(0)]
+        return rng.choice(candidates)
+
+    replacements = {source: choices for source, choices in PARAPHRASE_RULES}
+    pattern = re.compile("|".join(re.escape(source) for source, _ in PARAPHRASE_RULES))
+    parts = [pattern.sub(replace, part) for part in parts]
+
+    merged = []
+    for i, part in enumerate(parts):
+        merged.append(part)
+        if i < len(placeholders):
+            merged.append(placeholders[i])
+    return "".join(merged)
+
+
+def localize_text(text, substitutions):
+    """
+    (원래 값, 바꿀 값) 목록을 한 번에 치환합니다. 값이 비어 있는 쌍은 건너뜁니다.
+
+    모든 원래 값을 긴 것부터 하나의 정규식으로 묶어 한 번만 훑으므로, 앞서 바꿔 넣은 값
+    (예: 새 지역 주소 안의 다른 지역명)이 다른 쌍에 의해 다시 바뀌지 않습니다.
+    """
+    replacements = {}
+    for source, target in substitutions:
+        if source and target:
+            replacements.setdefault(source, target)
+    if not replacements:
+        return text
+    pattern = re.compile(
+        "|".join(re.escape(source) for source in sorted(replacements, key=len, reverse=True))
+    )
+    return pattern.sub(lambda match: replacements[match.group(0)], text)
+
+
+def variant_folder_name(folder_name, source_city, target_city):
+    """
+    원본 폴더 이름에서 지역을 바꾼 변형본 폴더 이름을 만듭니다. (상태 표시는 [처리후])
+    """
+    name = STATUS_MARK_PATTERN.sub("", folder_name)
+    if source_city and f"[{source_city}]" in name:
+        name = name.replace(f"[{source_city}]", f"[{target_city}]", 1)
+    else:
+        name = f"[{target_city}]{name}"
+    return f"[처리후]{name}"
+
+
+def _link_or_copy(source_path, target_path):
+    # 이미지는 가능하면 하드링크로 만들어 복사 비용을 줄이고, 나중에 바뀔 수 있는 파일은 복사
+    if source_path.lower().endswith(LINKABLE_EXTENSIONS):
+        try:
+            os.link(source_path, target_path)
+            return
+        except OSError:
+            pass
+    shutil.copy2(source_path, target_path)
+
+
+def fan_out_folder(
+    folder_path,
+    regions,
+    addresses=None,
+    source_city=None,
+    keyword=None,
+    phone=None,
+    paraphrase_rules=False,
+    output_dir=None,
+    catalog=None,
+):
+    """
+    생성이 끝난 폴더 하나를 지역별 변형본 폴더들로 복제합니다. (API 호출 없음)
+
+    Args:
+        folder_path (str): output.md 가 있는 원본 폴더
+        regions (list): 대상 지역 목록
+        addresses (dict, optional): 지역 -> 주소 (map.xlsx)
+        source_city (str, optional): 원본 지역명 (없으면 폴더 이름에서 추출)
+        keyword (str, optional): 원본 키워드를 바꿀 키워드
+        phone (str, optional): 본문 전화번호를 바꿀 번호
+        paraphrase_rules (bool): 지역마다 가벼운 표현 바꾸기 적용 여부
+        output_dir (str, optional): 변형본 폴더를 만들 디렉토리 (기본값: 원본과 같은 위치)
+        catalog (FolderCatalog, optional): 변형본을 포스팅 대기 상태로 등록할 카탈로그
+
+    Returns:
+        list: 생성된 변형본 폴더 경로 목록
+
+    Raises:
+        ValueError: output.md 가 없거나 원본 지역명을 알 수 없는 경우
+    """
+    folder_path = folder_path.rstrip(os.sep)
+    output_md_path = os.path.join(folder_path, "output.md")
+    if not os.path.exists(output_md_path):
+        raise ValueError(f"Output markdown file not found: {output_md_path}")
+
+    variables = folder_variables(folder_path)
+    source_city = source_city or variables.get("city")
+    if not source_city:
+        # 지역명을 모르면 폴더 이름만 다른 동일한 글이 만들어지므로 중단
+        raise ValueError(
+            f"원본 지역명을 알 수 없습니다 (폴더 이름에 [지역] 이 없으면 --source_city 지정): {folder_path}"
+        )
+    source_keyword = variables.get("keyword")
+    addresses = addresses or {}
+    output_dir = output_dir or os.path.dirname(os.path.abspath(folder_path))
+    os.makedirs(output_dir, exist_ok=True)
+
+    texts = {}
+    for file_name in TEXT_FILE_NAMES:
+        file_path = os.path.join(folder_path, file_name)
+        if os.path.exists(file_path):
+            with open(file_path, "r", encoding="utf-8") as f:
+                texts[file_name] = f.read()
+
+    created = []
+    for region in regions:
+        substitutions = [
+            (addresses.get(source_city), addresses.get(region)),
+            (source_city, region),
+            (source_keyword, keyword),
+        ]
+        target_path = os.path.join(
+            output_dir, variant_folder_name(os.path.basename(folder_path), source_city, region)
+        )
+        if os.path.exists(target_path):
+            print(f"이미 존재하는 폴더는 건너뜁니다: {target_path}")
+            continue
+
+        # 임시 폴더에 모두 만든 뒤 이름을 바꿔, 중간에 실패해도 반쯤 만든 [처리후] 폴더가 남지 않게 함
+        build_path = tempfile.mkdtemp(prefix=".fanout_", dir=output_dir)
+        try:
+            for entry in os.scandir(folder_path):
+                if not entry.is_file() or entry.name in TEXT_FILE_NAMES or entry.name in SKIP_FILE_NAMES:
+                    continue
+                _link_or_copy(entry.path, os.path.join(build_path, entry.name))
+
+            for file_name, text in texts.items():
+                text = localize_text(text, substitutions)
+                if phone:
+                    text = re.sub(r"010-\d{4}-\d{4}", phone, text)
+                if paraphrase_rules and file_name != "title.txt":
+                    text = paraphrase(text, seed=f"{os.path.basename(folder_path)}:{region}")
+                with open(os.path.join(build_path, file_name), "w", encoding="utf-8") as f:
+                    f.write(text)
+            os.rename(build_path, target_path)
+        except BaseException:
+            shutil.rmtree(build_path, ignore_errors=True)
+            raise
+
+        if catalog is not None:
+            catalog.record_transition(
+                target_path,
+                target_path,
+                STATUS_GENERATED,
+                content_hash=folder_content_hash(target_path),
+            )
+        created.append(target_path)
+        print(f"지역 변형본 생성 완료: {target_path}")
+
+    print(f"{len(created)}개 지역 변형본을 생성했습니다.")
+    return created
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="생성된 글 하나를 region.xlsx 의 지역들로 복제 (API 호출 없음)"
+    )
+    parser.add_argument("folder", type=str, help="output.md 가 있는 원본 폴더")
+    parser.add_argument(
+        "--regions",
+        type=str,
+        default=None,
+        help="대상 지역(쉼표 구분). 없으면 region.xlsx 의 '변경' 열 사용",
+    )
+    parser.add_argument("--region_file", type=str, default=DEFAULT_REGION_PATH)
+    parser.add_argument("--map_file", type=str, default=DEFAULT_MAP_PATH)
+    parser.add_argument("--source_city", type=str, default=None, help="원본 지역명")
+    parser.add_argument("--keyword", type=str, default=None, help="바꿀 키워드")
+    parser.add_argument(
+        "--phone", type=str, default=DEFAULT_VARIABLES["phone"], help="본문에 사용할 전화번호"
+    )
+    parser.add_argument(
+        "--paraphrase", action="store_true", help="지역마다 가벼운 표현 바꾸기 적용"
+    )
+    parser.add_argument("--output_dir", type=str, default=None, help="변형본 폴더 생성 위치")
+    parser.add_argument(
+        "--catalog", type=str, default=None, help="변형본을 등록할 카탈로그(SQLite) 경로"
+    )
+    args = parser.parse_args()
+    args.folder = args.folder.rstrip(os.sep)
+
+    source_city = args.source_city or folder_variables(args.folder).get("city")
+    if not source_city:
+        print(f"원본 지역명을 알 수 없습니다. --source_city 를 지정하세요: {args.folder}")
+        return
+    if args.regions:
+        regions = [r.strip() for r in args.regions.split(",") if r.strip()]
+    else:
+        regions = load_target_regions(args.region_file, source_city)
+    if not regions:
+        print("대상 지역이 없습니다.")
+        return
+
+    catalog = FolderCatalog(args.catalog) if args.catalog else None
+    try:
+        fan_out_folder(
+            args.folder,
+            regions,
+            addresses=load_region_addresses(args.map_file),
+            source_city=source_city,
+            keyword=args.keyword,
+            phone=args.phone,
+            paraphrase_rules=args.paraphrase,
+            output_dir=args.output_dir,
+            catalog=catalog,
+        )
+    finally:
+        if catalog is not None:
+            catalog.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+import os
+import re
+import json
+import time
+import zipfile
+import tempfile
+import traceback
+from collections import deque
+from datetime import datetime
+
+
+DEFAULT_FLIGHT_DIR = os.path.join("result", "flight_records")
+DEFAULT_CAPACITY = 500
+DEFAULT_MAX_BUNDLES = 50
+DEFAULT_MAX_MB = 200
+
+# 이벤트 하나에 남기는 최대 문자 수 (긴 콘솔 메시지/URL 로 버퍼가 커지지 않도록)
+MAX_TEXT_CHARS = 500
+# 정상 응답 중 기록할 리소스 종류 (이미지/폰트 등은 오류일 때만 기록)
+RECORDED_RESOURCE_TYPES = ("document", "xhr", "fetch")
+
+
+def _clip(text):
+    text = str(text)
+    if len(text) > MAX_TEXT_CHARS:
+        return text[:MAX_TEXT_CHARS] + "..."
+    return text
+
+
+def _safe_name(name):
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", name).strip("_") or "folder"
+
+
+class FlightRecorder:
+    """
+    브라우저 포스팅 중 최근 동작/콘솔/네트워크 이벤트를 링 버퍼에 상시 기록하고,
+    실패한 경우에만 Playwright trace 와 스크린샷을 묶어 폴더별 압축 파일로 남깁니다.
+
+    정상 종료 시에는 trace 를 저장하지 않고 버리므로 디스크에 남는 것이 없습니다.
+    저장된 묶음은 개수/전체 용량 한도를 넘으면 오래된 것부터 삭제합니다.
+
+    Args:
+        folder_path (str): 포스팅 중인 폴더 (묶음 파일 이름에 사용)
+        output_dir (str): 묶음 파일 저장 디렉토리
+        capacity (int): 링 버퍼에 보관할 최근 이벤트 수
+        trace (bool): Playwright trace(스크린샷/스냅샷 포함) 수집 여부
+        max_bundles (int): 보관할 최대 묶음 수
+        max_mb (float): 보관할 묶음 전체 최대 용량(MB)
+    """
+
+    def __init__(
+        self,
+        folder_path,
+        output_dir=DEFAULT_FLIGHT_DIR,
+        capacity=DEFAULT_CAPACITY,
+        trace=True,
+        max_bundles=DEFAULT_MAX_BUNDLES,
+        max_mb=DEFAULT_MAX_MB,
+    ):
+        self.folder_path = folder_path
+        self.output_dir = output_dir
+        self.trace = trace
+        self.max_bundles = max_bundles
+        self.max_bytes = int(max_mb * 1024 * 1024)
+
+        self.events = deque(maxlen=capacity)
+        self.bundle_path = None
+        self._context = None
+        self._page = None
+        self._tracing = False
+        self._started = time.perf_counter()
+        self._last_action = None
+
+    def record(self, kind, **fields):
+        """
+        이벤트 하나를 링 버퍼에 추가합니다.
+        """
+        event = {"t": round(time.perf_counter() - self._started, 3), "kind": kind}
+        event.update(fields)
+        self.events.append(event)
+
+    def action(self, name):
+        """
+        포스팅 단계 시작을 기록합니다. 직전 단계의 소요 시간을 함께 남깁니다.
+        """
+        now = time.perf_counter()
+        if self._last_action is not None:
+            previous, started = self._last_action
+            self.record("action_end", name=previous, duration=round(now - started, 3))
+        self._last_action = (name, now)
+        self.record("action", name=name)
+
+    def attach(self, context, page):
+        """
+        브라우저 컨텍스트/페이지 이벤트를 구독하고 trace 수집을 시작합니다.
+        """
+        self._context = context
+        self._page = page
+
+        page.on(
+            "console",
+            lambda msg: self.record("console", level=msg.type, text=_clip(msg.text)),
+        )
+        page.on("pageerror", lambda error: self.record("pageerror", text=_clip(error)))
+        page.on(
+            "requestfailed",
+            lambda request: self.record(
+                "requestfailed",
+                method=request.method,
+                url=_clip(request.url),
+                failure=_clip(request.failure),
+            ),
+        )
+        page.on("response", self._on_response)
+        page.on(
+            "framenavigated",
+            lambda frame: self.record(
+                "navigated", frame=frame.name or "main", url=_clip(frame.url)
+            ),
+        )
+
+        if self.trace:
+            try:
+                context.tracing.start(screenshots=True, snapshots=True)
+                self._tracing = True
+            except Exception as e:
+                print(f"Trace 수집을 시작하지 못했습니다: {e}")
+
+    def _on_response(self, response):
+        request = response.request
+        if response.status < 400 and request.resource_type not in RECORDED_RESOURCE_TYPES:
+            return
+        self.record(
+            "response",
+            status=response.status,
+            method=request.method,
+            resource=request.resource_type,
+            url=_clip(response.url),
+        )
+
+    def capture_failure(self, error):
+        """
+        실패 시점의 trace/스크린샷/페이지 HTML 과 이벤트 버퍼를 압축 파일 하나로 저장합니다.
+
+        Args:
+            error: 실패 원인 (예외 또는 문자열)
+
+        Returns:
+            str: 저장된 묶음 파일 경로 (저장하지 못하면 None)
+        """
+        if self.bundle_path is not None:
+            return self.bundle_path
+        self.action("failure")
+        summary = {
+            "folder": self.folder_path,
+            "error": str(error),
+            "error_type": type(error).__name__,
+            "traceback": (
+                "".join(traceback.format_exception(type(error), error, error.__traceback__))
+                if isinstance(error, BaseException)
+                else None
+            ),
+            "elapsed": round(time.perf_counter() - self._started, 3),
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+            "url": None,
+        }
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        folder_name = _safe_name(os.path.basename(str(self.folder_path).rstrip(os.sep)))
+        bundle_path = os.path.join(self.output_dir, f"{folder_name}_{timestamp}.zip")
+
+        with tempfile.TemporaryDirectory() as tmp_dir, zipfile.ZipFile(
+            bundle_path, "w", compression=zipfile.ZIP_DEFLATED
+        ) as bundle:
+            if self._page is not None:
+                try:
+                    summary["url"] = self._page.url
+                    screenshot_path = os.path.join(tmp_dir, "screenshot.png")
+                    self._page.screenshot(path=screenshot_path, full_page=True)
+                    bundle.write(screenshot_path, "screenshot.png", zipfile.ZIP_STORED)
+                except Exception as e:
+                    summary["screenshot_error"] = str(e)
+                try:
+                    bundle.writestr("page.html", self._page.content())
+                except Exception as e:
+                    summary["html_error"] = str(e)
+            if self._tracing:
+                try:
+                    trace_path = os.path.join(tmp_dir, "trace.zip")
+                    self._context.tracing.stop(path=trace_path)
+                    bundle.write(trace_path, "trace.zip", zipfile.ZIP_STORED)
+                except Exception as e:
+                    summary["trace_error"] = str(e)
+                self._tracing = False
+
+            bundle.writestr(
+                "events.jsonl",
+                "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in self.events),
+            )
+            bundle.writestr("summary.json", json.dumps(summary, ensure_ascii=False, indent=2))
+
+        self.bundle_path = bundle_path
+        print(f"실패 기록 저장 완료: {bundle_path} (npx playwright show-trace 로 trace.zip 확인)")
+        enforce_retention(self.output_dir, self.max_bundles, self.max_bytes)
+        return bundle_path
+
+    def finish(self):
+        """
+        실패 기록을 남기지 않은 경우 수집 중인 trace 를 저장 없이 종료합니다.
+        """
+        if self._tracing:
+            try:
+                self._context.tracing.stop()
+            except Exception as e:
+                print(f"Trace 종료 중 오류: {e}")
+            self._tracing = False
+
+
+def enforce_retention(output_dir, max_bundles=DEFAULT_MAX_BUNDLES, max_bytes=None):
+    """
+    최신 묶음부터 개수/용량 한도 안에 드는 것만 남기고 나머지를 삭제합니다.
+    가장 최근 묶음은 한도를 넘더라도 남깁니다.
+    """
+    if max_bytes is None:
+        max_bytes = DEFAULT_MAX_MB * 1024 * 1024
+    bundles = []
+    for entry in os.scandir(output_dir):
+        if entry.is_file() and entry.name.endswith(".zip"):
+            stat = entry.stat()
+            bundles.append((stat.st_mtime, stat.st_size, entry.path))
+    bundles.sort(reverse=True)
+
+    total = 0
+    for index, (_, size, path) in enumerate(bundles):
+        total += size
+        if index == 0 or (index < max_bundles and total <= max_bytes):
+            continue
+        try:
+            os.remove(path)
+            print(f"보관 한도를 넘은 실패 기록 삭제: {path}")
+        except OSError as e:
+            print(f"실패 기록 삭제 오류: {path} ({e})")
+
+
+def add_flight_recorder_arguments(parser):
+    """
+    CLI 에 실패 기록(flight recorder) 옵션을 추가합니다.
+    """
+    parser.add_argument(
+        "--flight_dir",
+        type=str,
+        default=DEFAULT_FLIGHT_DIR,
+        help="실패 기록 묶음 저장 디렉토리",
+    )
+    parser.add_argument(
+        "--flight_events",
+        type=int,
+        default=DEFAULT_CAPACITY,
+        help="실패 기록에 남길 최근 이벤트 수",
+    )
+    parser.add_argument(
+        "--flight_max_bundles",
+        type=int,
+        default=DEFAULT_MAX_BUNDLES,
+        help="보관할 최대 실패 기록 수",
+    )
+    parser.add_argument(
+        "--flight_max_mb",
+        type=float,
+        default=DEFAULT_MAX_MB,
+        help="보관할 실패 기록 전체 최대 용량(MB)",
+    )
+    parser.add_argument(
+        "--no_flight_trace",
+        action="store_true",
+        help="Playwright trace 수집 끄기 (이벤트/스크린샷만 기록)",
+    )
+
+
+def recorder_from_args(args, folder_path):
+    """
+    add_flight_recorder_arguments 로 받은 옵션으로 폴더 하나의 기록기를 만듭니다.
+    """
+    return FlightRecorder(
+        folder_path,
+        output_dir=args.flight_dir,
+        capacity=args.flight_events,
+        trace=not args.no_flight_trace,
+        max_bundles=args.flight_max_bundles,
+        max_mb=args.flight_max_mb,
+    )
@@ -0,0 +1,554 @@
+import os
+import json
+import hashlib
+import argparse
+import re
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime
+
+from hk_catalog import FolderCatalog, STATUS_PENDING, folder_content_hash, parse_folder_name
+
+
+# search.js / server.js 가 기록하는 검색 결과 파일
+DEFAULT_RESULTS_PATH = os.path.join("result", "search_results.json")
+# 이미 처리한 항목의 지문을 누적 기록하는 상태 파일 (JSONL, append-only)
+DEFAULT_STATE_PATH = os.path.join("result", "ingest_state.jsonl")
+# 생성 대기열 (JSONL, append-only)
+DEFAULT_QUEUE_PATH = os.path.join("result", "generation_queue.jsonl")
+# 대기열 중 다운로드를 마친 항목 기록 (JSONL, append-only)
+DEFAULT_DOWNLOAD_STATE_PATH = os.path.join("result", "download_state.jsonl")
+# server.js 의 블로그 다운로드 API
+DEFAULT_DOWNLOAD_URL = "http://localhost:3000/api/download-blog"
+# server.js 의 다운로드 완료(extracted) 표시 API (list.html 과 같은 방식)
+STATUS_API_PATH = "/api/results/status"
+# 생성 대기 폴더 표시 (hk_write_post 의 PENDING_MARK)
+PENDING_MARK = "[처리전]"
+# 다운로드된 폴더가 가질 수 있는 접두 표시 (이름을 바꾼 뒤에도 이미 받은 것으로 봄)
+FOLDER_MARKS = ("", PENDING_MARK, "[처리후]")
+
+# 스트리밍 파싱 시 한 번에 읽어들이는 크기
+READ_CHUNK_SIZE = 64 * 1024
+
+# 작업 항목 생성에 사용하는 필드 (title 등 표시용 필드 변경만으로는 재처리하지 않음)
+# extracted 는 다운로드 여부 표시일 뿐이므로 지문에 넣지 않고 따로 걸러냄
+FINGERPRINT_FIELDS = ("link", "city", "keyword", "fromDate", "toDate")
+
+
+def iter_search_results(results_path, chunk_size=READ_CHUNK_SIZE):
+    """
+    search_results.json 을 통째로 메모리에 올리지 않고 (URL, 항목) 쌍을 하나씩 반환합니다.
+
+    파일은 `{ "URL": {...}, ... }` 형태의 단일 객체이므로, 최상위 객체의 키와 값을
+    json.JSONDecoder.raw_decode 로 하나씩 잘라 읽습니다.
+
+    Args:
+        results_path (str): 검색 결과 JSON 파일 경로
+        chunk_size (int): 한 번에 읽을 문자 수
+
+    Yields:
+        tuple: (URL, 항목 dict)
+    """
+    decoder = json.JSONDecoder()
+    whitespace = re.compile(r"[\s]*")
+
+    with open(results_path, "r", encoding="utf-8") as f:
+        buffer = ""
+        position = 0
+        eof = False
+
+        def fill():
+            # 버퍼가 부족할 때 다음 조각을 읽어 붙임 (이미 소비한 앞부분은 버림)
+            nonlocal buffer, position, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buffer = buffer[position:] + chunk
+            position = 0
+            return True
+
+        def skip_whitespace():
+            nonlocal position
+            while True:
+                position = whitespace.match(buffer, position).end()
+                if position < len(buffer) or not fill():
+                    return
+
+        def decode_value():
+            nonlocal position
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if fill():
+                        continue
+                    raise
+                # 숫자 등 경계가 모호한 값은 버퍼 끝에서 잘릴 수 있으므로 한 번 더 읽어 확인
+                if end == len(buffer) and not eof and fill():
+                    continue
+                position = end
+                return value
+
+        def expect(char):
+            nonlocal position
+            skip_whitespace()
+            if position >= len(buffer) or buffer[position] != char:
+                raise ValueError(
+                    f"'{results_path}' 파싱 오류: '{char}' 가 필요합니다 (위치 {position})"
+                )
+            position += 1
+
+        expect("{")
+        skip_whitespace()
+        if position < len(buffer) and buffer[position] == "}":
+            return
+
+        while True:
+            skip_whitespace()
+            key = decode_value()
+            expect(":")
+            skip_whitespace()
+            value = decode_value()
+            yield key, value
+
+            skip_whitespace()
+            if position >= len(buffer):
+                raise ValueError(f"'{results_path}' 파싱 오류: 파일이 중간에 끝났습니다")
+            if buffer[position] == ",":
+                position += 1
+                continue
+            if buffer[position] == "}":
+                return
+            raise ValueError(
+                f"'{results_path}' 파싱 오류: ',' 또는 '}}' 가 필요합니다 (위치 {position})"
+            )
+
+
+def fingerprint_entry(entry):
+    """
+    작업 항목 생성에 영향을 주는 필드만으로 항목의 지문(sha1)을 계산합니다.
+    """
+    payload = {field: entry.get(field) for field in FINGERPRINT_FIELDS}
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def load_ingest_state(state_path):
+    """
+    상태 파일을 읽어 워터마크와 URL별 마지막 지문을 반환합니다.
+
+    상태 파일은 append-only JSONL 이며 같은 URL 이 여러 번 나오면 마지막 줄이 유효합니다.
+    손상된 줄(쓰기 도중 중단 등)은 건너뜁니다.
+
+    Returns:
+        tuple: (watermark dict 또는 None, {URL: 지문})
+    """
+    watermark = None
+    fingerprints = {}
+    if not os.path.exists(state_path):
+        return watermark, fingerprints
+
+    with open(state_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"손상된 상태 기록을 건너뜁니다: {line[:80]}")
+                continue
+            if record.get("type") == "watermark":
+                watermark = record
+            elif "link" in record:
+                fingerprints[record["link"]] = record.get("hash")
+    return watermark, fingerprints
+
+
+def make_folder_name(link, entry):
+    """
+    downloadBlog.js 의 processBlogUrl 과 같은 규칙으로 작업 폴더 이름을 만듭니다.
+    ([지역]키워드_blogId_logNo)
+    """
+    match = re.search(r"blog\.naver\.com/([^/?#]+)/(\d+)", link or "")
+    if not match:
+        return None
+    blog_id, log_no = match.groups()
+    return f"[{entry.get('city', '')}]{entry.get('keyword', '')}_{blog_id}_{log_no}"
+
+
+def build_work_item(link, entry):
+    """
+    검색 결과 항목 하나를 생성 대기열의 작업 항목으로 변환합니다.
+    """
+    return {
+        "link": link,
+        "title": entry.get("title", ""),
+        "city": entry.get("city", ""),
+        "keyword": entry.get("keyword", ""),
+        "fromDate": entry.get("fromDate", ""),
+        "toDate": entry.get("toDate", ""),
+        "extracted": bool(entry.get("extracted", False)),
+        "folder_name": make_folder_name(link, entry),
+        "queued_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def ingest_search_results(
+    results_path=DEFAULT_RESULTS_PATH,
+    state_path=DEFAULT_STATE_PATH,
+    queue_path=DEFAULT_QUEUE_PATH,
+    force=False,
+):
+    """
+    검색 결과 중 마지막 워터마크 이후 새로 생겼거나 변경된 항목만 생성 대기열에 추가합니다.
+
+    검색 결과 파일의 크기와 수정 시각이 워터마크와 같으면 파일을 읽지 않고 종료합니다.
+    대기열과 상태 파일은 모두 끝에 덧붙이기만 하므로 전체를 다시 쓰지 않습니다.
+
+    Args:
+        results_path (str): search_results.json 경로
+        state_path (str): 상태 파일(JSONL) 경로
+        queue_path (str): 생성 대기열(JSONL) 경로
+        force (bool): 워터마크가 같아도 파일을 다시 훑을지 여부
+
+    Returns:
+        list: 이번에 대기열에 추가된 작업 항목 목록
+    """
+    if not os.path.exists(results_path):
+        print(f"검색 결과 파일을 찾을 수 없습니다: {results_path}")
+        return []
+
+    stat = os.stat(results_path)
+    watermark, fingerprints = load_ingest_state(state_path)
+    if (
+        not force
+        and watermark
+        and watermark.get("size") == stat.st_size
+        and watermark.get("mtime_ns") == stat.st_mtime_ns
+    ):
+        print("검색 결과가 마지막 수집 이후 변경되지 않았습니다.")
+        return []
+
+    new_items = []
+    state_records = []
+    scanned = 0
+    for link, entry in iter_search_results(results_path):
+        scanned += 1
+        if not isinstance(entry, dict):
+            continue
+        # list.html 등에서 이미 다운로드한 항목은 대기열에 넣지 않음
+        if entry.get("extracted"):
+            continue
+        digest = fingerprint_entry(entry)
+        if fingerprints.get(link) == digest:
+            continue
+        new_items.append(build_work_item(link, entry))
+        state_records.append({"link": link, "hash": digest})
+        fingerprints[link] = digest
+
+    for path in (state_path, queue_path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    # 대기열을 먼저 기록해야 중간에 중단되어도 항목이 유실되지 않음 (재실행 시 중복은 가능)
+    if new_items:
+        with open(queue_path, "a", encoding="utf-8") as f:
+            for item in new_items:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+    with open(state_path, "a", encoding="utf-8") as f:
+        for record in state_records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.write(
+            json.dumps(
+                {
+                    "type": "watermark",
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "scanned": scanned,
+                    "ingested_at": datetime.now().isoformat(timespec="seconds"),
+                },
+                ensure_ascii=False,
+            )
+            + "\n"
+        )
+
+    print(f"검색 결과 {scanned}건 중 신규/변경 {len(new_items)}건을 대기열에 추가했습니다.")
+    return new_items
+
+
+def read_jsonl(path):
+    """
+    JSONL 파일의 기록을 순서대로 반환합니다. 손상된 줄(쓰기 도중 중단 등)은 건너뜁니다.
+    """
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                print(f"손상된 기록을 건너뜁니다: {line[:80]}")
+    return records
+
+
+def pending_queue_items(
+    queue_path=DEFAULT_QUEUE_PATH, download_state_path=DEFAULT_DOWNLOAD_STATE_PATH, base_dir="."
+):
+    """
+    대기열에서 아직 다운로드하지 않은 작업 항목을 반환합니다.
+
+    같은 URL 이 여러 번 대기열에 들어간 경우 마지막 항목만 사용하고, 다운로드 기록에 있거나
+    작업 폴더([처리전]/[처리후] 포함)가 이미 있는 항목은 건너뜁니다.
+    """
+    downloaded = {record.get("link") for record in read_jsonl(download_state_path)}
+    items = {}
+    for item in read_jsonl(queue_path):
+        link = item.get("link")
+        if link and link not in downloaded:
+            items[link] = item
+    # 대기열에 들어간 뒤 다른 경로로 다운로드된 항목 (마지막 항목 기준)
+    items = {link: item for link, item in items.items() if not item.get("extracted")}
+
+    pending = []
+    for item in items.values():
+        folder_name = item.get("folder_name")
+        if folder_name and any(
+            os.path.isdir(os.path.join(base_dir, mark + folder_name)) for mark in FOLDER_MARKS
+        ):
+            continue
+        pending.append(item)
+    return pending
+
+
+def post_json(url, payload, method="POST", timeout=600):
+    """
+    server.js API 에 JSON 요청을 보내고 응답 JSON 을 반환합니다.
+
+    Returns:
+        dict: API 응답 ({"success": bool, "message": str, ...})
+    """
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method=method,
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        # 실패 응답도 {"success": false, "message": ...} 형태의 JSON 본문을 가짐
+        try:
+            return json.loads(e.read().decode("utf-8"))
+        except ValueError:
+            return {"success": False, "message": f"HTTP {e.code}"}
+
+
+def request_download(item, download_url=DEFAULT_DOWNLOAD_URL, timeout=600):
+    """
+    server.js 의 다운로드 API 로 작업 항목 하나의 블로그 글을 내려받습니다.
+
+    Returns:
+        dict: API 응답 ({"success": bool, "message": str, "folderPath": str})
+    """
+    payload = {
+        "blogUrl": item["link"],
+        "title": item.get("title") or None,
+        "region": item.get("city", ""),
+        "keyword": item.get("keyword", ""),
+    }
+    return post_json(download_url, payload, timeout=timeout)
+
+
+def mark_pending(folder_path, catalog=None):
+    """
+    다운로드된 폴더 이름에 [처리전] 을 붙여 생성 단계(hk_write_post)가 찾을 수 있게 하고,
+    카탈로그를 사용 중이면 pending 으로 등록합니다.
+
+    Returns:
+        str: 이름이 바뀐 폴더 경로 (이미 같은 이름의 폴더가 있으면 원래 경로)
+    """
+    folder_name = os.path.basename(folder_path.rstrip(os.sep))
+    pending_path = folder_path
+    if PENDING_MARK not in folder_name:
+        target = os.path.join(
+            os.path.dirname(folder_path.rstrip(os.sep)), PENDING_MARK + folder_name
+        )
+        if os.path.exists(target):
+            print(f"같은 이름의 [처리전] 폴더가 이미 있어 이름을 바꾸지 않습니다: {target}")
+            return folder_path
+        os.rename(folder_path, target)
+        print(f"폴더 이름 변경 완료: {folder_path} -> {target}")
+        pending_path = target
+
+    if catalog is not None:
+        region, keyword = parse_folder_name(os.path.basename(pending_path))
+        catalog.upsert_folder(
+            pending_path,
+            STATUS_PENDING,
+            region=region,
+            keyword=keyword,
+            content_hash=folder_content_hash(pending_path),
+        )
+    return pending_path
+
+
+def mark_extracted(links, download_url=DEFAULT_DOWNLOAD_URL):
+    """
+    다운로드한 항목을 search_results.json 에 extracted 로 표시합니다. (list.html 과 같은 API)
+    """
+    status_url = urllib.parse.urljoin(download_url, STATUS_API_PATH)
+    try:
+        result = post_json(status_url, {"linksToUpdate": links}, method="PATCH")
+    except (urllib.error.URLError, OSError) as e:
+        result = {"success": False, "message": str(e)}
+    if not result.get("success"):
+        print(f"다운로드 상태(extracted) 갱신 실패: {result.get('message')}")
+
+
+def download_queued_items(
+    queue_path=DEFAULT_QUEUE_PATH,
+    download_state_path=DEFAULT_DOWNLOAD_STATE_PATH,
+    download_url=DEFAULT_DOWNLOAD_URL,
+    base_dir=".",
+    limit=None,
+    catalog=None,
+):
+    """
+    대기열의 미처리 항목을 다운로드 단계로 넘기고, 성공한 항목을 다운로드 기록에 덧붙입니다.
+
+    내려받은 폴더는 [처리전] 표시를 붙여(카탈로그 사용 시 pending 으로 등록) 바로 생성 단계로 넘기고,
+    search_results.json 에도 extracted 로 표시합니다.
+    실패한 항목은 기록하지 않으므로 다음 실행에서 다시 시도합니다.
+
+    Returns:
+        list: 이번에 다운로드한 항목의 기록 목록
+    """
+    items = pending_queue_items(queue_path, download_state_path, base_dir)
+    if limit is not None:
+        items = items[:limit]
+    if not items:
+        print("다운로드할 대기열 항목이 없습니다.")
+        return []
+
+    directory = os.path.dirname(download_state_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    downloaded = []
+    for index, item in enumerate(items, 1):
+        print(
+            f"[{index}/{len(items)}] 다운로드: [{item.get('city', '')}] "
+            f"{item.get('title', '')} ({item['link']})"
+        )
+        try:
+            result = request_download(item, download_url)
+        except (urllib.error.URLError, OSError) as e:
+            print(f"다운로드 서버에 연결할 수 없습니다 ({download_url}): {e}")
+            break
+        if not result.get("success"):
+            print(f"다운로드 실패: {item['link']} - {result.get('message')}")
+            continue
+        folder_path = result.get("folderPath")
+        if folder_path:
+            try:
+                folder_path = mark_pending(folder_path, catalog)
+            except OSError as e:
+                print(f"폴더를 [처리전] 으로 표시하지 못했습니다: {folder_path} ({e})")
+        record = {
+            "link": item["link"],
+            "folder_path": folder_path,
+            "downloaded_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        # 항목마다 바로 기록해야 중간에 중단되어도 이미 받은 글을 다시 받지 않음
+        with open(download_state_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        downloaded.append(record)
+        print(f"다운로드 완료: {record['folder_path']}")
+
+    if downloaded:
+        mark_extracted([record["link"] for record in downloaded], download_url)
+    print(f"대기열 항목 {len(items)}건 중 {len(downloaded)}건을 다운로드했습니다.")
+    return downloaded
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="search_results.json 의 신규/변경 항목을 생성 대기열에 추가"
+    )
+    parser.add_argument(
+        "--results", type=str, default=DEFAULT_RESULTS_PATH, help="검색 결과 파일 경로"
+    )
+    parser.add_argument(
+        "--state", type=str, default=DEFAULT_STATE_PATH, help="수집 상태 파일 경로"
+    )
+    parser.add_argument(
+        "--queue", type=str, default=DEFAULT_QUEUE_PATH, help="생성 대기열 파일 경로"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="워터마크와 무관하게 전체를 다시 확인"
+    )
+    parser.add_argument(
+        "--download",
+        action="store_true",
+        help="수집 후 대기열의 미처리 항목을 server.js 다운로드 API 로 내려받기",
+    )
+    parser.add_argument(
+        "--download_state",
+        type=str,
+        default=DEFAULT_DOWNLOAD_STATE_PATH,
+        help="다운로드 기록 파일 경로",
+    )
+    parser.add_argument(
+        "--download_url", type=str, default=DEFAULT_DOWNLOAD_URL, help="다운로드 API 주소"
+    )
+    parser.add_argument(
+        "--base_dir", type=str, default=".", help="작업 폴더가 생성되는 디렉토리"
+    )
+    parser.add_argument(
+        "--limit", type=int, default=None, help="한 번에 다운로드할 최대 항목 수"
+    )
+    parser.add_argument(
+        "--catalog",
+        type=str,
+        default=None,
+        help="다운로드한 폴더를 pending 으로 등록할 카탈로그(SQLite) 경로",
+    )
+    args = parser.parse_args()
+
+    try:
+        items = ingest_search_results(args.results, args.state, args.queue, args.force)
+    except ValueError as e:
+        # search.js 가 파일을 쓰는 도중이면 내용이 잘려 있을 수 있음 (상태는 기록되지 않음)
+        print(f"검색 결과 파일을 읽지 못했습니다. 저장 중일 수 있으니 잠시 후 다시 실행하세요: {e}")
+        items = []
+    for item in items:
+        print(f"  [{item['city']}] {item['keyword']} - {item['title']} ({item['link']})")
+
+    if args.download:
+        catalog = FolderCatalog(args.catalog) if args.catalog else None
+        try:
+            download_queued_items(
+                args.queue,
+                args.download_state,
+                args.download_url,
+                args.base_dir,
+                args.limit,
+                catalog,
+            )
+        finally:
+            if catalog is not None:
+                catalog.close()
+
+
+if __name__ == "__main__":
+    main()
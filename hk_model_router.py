@@ -0,0 +1,341 @@
+import os
+import json
+import math
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+
+
+DEFAULT_MODELS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "docs", "models.json"
+)
+DEFAULT_ROUTING_LOG_PATH = os.path.join("result", "routing_log.jsonl")
+
+
+def load_model_ids(models_path=DEFAULT_MODELS_PATH, preferred=None, structured=False):
+    """
+    models.json 에서 모델 ID 목록을 읽어 우선순위 순서로 반환합니다.
+
+    preferred(--model) 가 가장 앞, 그 다음 models.json 의 default, 나머지는 파일 순서입니다.
+    상대 경로는 스크립트 위치 기준으로 해석합니다.
+    structured 가 True 이면 models.json 에서 "structured": false 로 표시된
+    (json_schema 구조화 출력을 지원하지 않는) 모델을 제외합니다.
+
+    Raises:
+        FileNotFoundError: 모델 목록 파일이 없는 경우
+        ValueError: 사용할 수 있는 모델이 없는 경우
+    """
+    models_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), models_path)
+    with open(models_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    model_ids = [model["id"] for model in config.get("models", [])]
+    for first in (config.get("default"), preferred):
+        if first:
+            if first in model_ids:
+                model_ids.remove(first)
+            model_ids.insert(0, first)
+
+    if structured:
+        unsupported = {
+            model["id"] for model in config.get("models", []) if model.get("structured") is False
+        }
+        model_ids = [model_id for model_id in model_ids if model_id not in unsupported]
+        if not model_ids:
+            raise ValueError("구조화 출력을 지원하는 모델이 없습니다")
+    return model_ids
+
+
+class ModelStats:
+    """
+    모델 하나의 최근 지연 시간과 성공/실패 기록 (고정 길이 윈도우)
+    """
+
+    def __init__(self, window=50):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.last_used = None
+
+    def record(self, latency, ok):
+        if ok:
+            self.latencies.append(latency)
+        self.outcomes.append(ok)
+        self.last_used = time.monotonic()
+
+    def reset(self):
+        self.latencies.clear()
+        self.outcomes.clear()
+
+    def error_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return 1 - sum(self.outcomes) / len(self.outcomes)
+
+    def percentile(self, q):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+        return ordered[index]
+
+
+class ModelRouter:
+    """
+    지연 시간/오류율을 기준으로 모델을 고르고, 실패 시 다음 모델로 넘기며,
+    필요하면 p95 를 넘긴 요청에 대해 다음 모델로 헤지 요청을 보냅니다.
+
+    오류율이 정상인 모델은 최근 p50(같으면 p95)이 빠른 순으로, 샘플이 부족한 모델은 설정 순서대로
+    그 뒤에 둡니다. probe_every 번째 요청마다 통계가 가장 부족한 모델을 먼저 시도해 통계를
+    갱신하고, 오류율이 높아 밀려난 모델은 recovery_after 초 동안 쓰이지 않으면 통계를 비워
+    다시 설정 순서로 돌아오게 합니다.
+
+    Args:
+        models (list): 우선순위 순서의 모델 ID 목록
+        hedge (bool): 헤지 요청 사용 여부
+        window (int): 모델별 통계를 유지할 최근 요청 수
+        min_samples (int): p95 를 신뢰하기 위한 최소 성공 샘플 수
+        max_error_rate (float): 이 값을 넘는 오류율의 모델은 순서상 뒤로 밀림
+        probe_every (int): 이 횟수마다 한 번 통계가 가장 부족한 모델로 먼저 요청 (0 이면 사용 안 함)
+        recovery_after (float): 밀려난 모델의 통계를 비우기까지 기다릴 시간(초)
+        log_path (str): 폴더별 라우팅 결정을 기록할 JSONL 경로 (None 이면 기록 안 함)
+    """
+
+    def __init__(
+        self,
+        models,
+        hedge=False,
+        window=50,
+        min_samples=5,
+        max_error_rate=0.5,
+        probe_every=20,
+        recovery_after=300,
+        log_path=DEFAULT_ROUTING_LOG_PATH,
+    ):
+        if not models:
+            raise ValueError("라우팅할 모델이 없습니다")
+        self.models = list(models)
+        self.hedge = hedge
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.probe_every = probe_every
+        self.recovery_after = recovery_after
+        self.log_path = log_path
+        self._calls = 0
+        self.stats = {model: ModelStats(window) for model in self.models}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_models_file(
+        cls, models_path=DEFAULT_MODELS_PATH, preferred=None, structured=False, **kwargs
+    ):
+        return cls(load_model_ids(models_path, preferred, structured), **kwargs)
+
+    def record(self, model, latency, ok):
+        with self._lock:
+            self.stats[model].record(latency, ok)
+
+    def hedge_delay(self, model):
+        """
+        헤지 요청을 보내기 전 기다릴 시간(해당 모델의 p95). 샘플이 부족하면 None.
+        """
+        with self._lock:
+            stats = self.stats[model]
+            if len(stats.latencies) < self.min_samples:
+                return None
+            return stats.percentile(0.95)
+
+    def _latency_key(self, model):
+        stats = self.stats[model]
+        if len(stats.latencies) < self.min_samples:
+            return (math.inf, math.inf)
+        return (stats.percentile(0.5), stats.percentile(0.95))
+
+    def ordered_models(self):
+        """
+        정상 모델은 최근 p50/p95 가 빠른 순(샘플이 부족하면 설정 순서로 뒤에), 오류율이 높은 모델은
+        맨 뒤로 보냅니다. 오래 쉰 불량 모델은 통계를 비워 다시 기회를 줍니다.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for model in self.models:
+                stats = self.stats[model]
+                if (
+                    stats.error_rate() > self.max_error_rate
+                    and stats.last_used is not None
+                    and now - stats.last_used > self.recovery_after
+                ):
+                    stats.reset()
+                    print(f"{model} 모델 통계를 초기화하고 다시 라우팅 대상에 포함합니다.")
+            healthy = [
+                m for m in self.models if self.stats[m].error_rate() <= self.max_error_rate
+            ]
+            unhealthy = [m for m in self.models if m not in healthy]
+            # sorted 는 안정 정렬이므로 샘플이 부족한 모델끼리는 설정 순서 유지
+            healthy.sort(key=self._latency_key)
+        return healthy + unhealthy
+
+    def _probe_key(self, model):
+        # 샘플이 적은 모델, 그 다음 가장 오래 쓰지 않은 모델 순
+        stats = self.stats[model]
+        last_used = stats.last_used if stats.last_used is not None else -math.inf
+        return (len(stats.outcomes), last_used)
+
+    def _next_candidates(self):
+        # probe_every 번째 요청마다 통계가 가장 부족한 모델을 맨 앞으로 (통계 갱신/복구 확인용)
+        ordered = self.ordered_models()
+        with self._lock:
+            self._calls += 1
+            probing = (
+                self.probe_every > 0
+                and len(ordered) > 1
+                and self._calls % self.probe_every == 0
+            )
+            if probing:
+                probe = min(ordered[1:], key=self._probe_key)
+                ordered.remove(probe)
+                ordered.insert(0, probe)
+        return ordered, probing
+
+    def _timed(self, request_fn, model):
+        started = time.monotonic()
+        try:
+            result = request_fn(model)
+        except Exception:
+            self.record(model, time.monotonic() - started, False)
+            raise
+        self.record(model, time.monotonic() - started, True)
+        return result
+
+    def _submit(self, executor, request_fn, model, hedged, attempts):
+        attempt = {"model": model, "hedged": hedged, "started": time.monotonic()}
+        attempts.append(attempt)
+        future = executor.submit(self._timed, request_fn, model)
+        future.attempt = attempt
+        return future
+
+    @staticmethod
+    def _settle(future):
+        attempt = future.attempt
+        if "latency" in attempt:
+            return
+        attempt["latency"] = round(time.monotonic() - attempt["started"], 3)
+        error = future.exception()
+        attempt["ok"] = error is None
+        if error is not None:
+            attempt["error"] = str(error)
+
+    def call(self, request_fn, folder=None):
+        """
+        request_fn(model) 을 라우팅 정책에 따라 호출하고 먼저 성공한 결과를 반환합니다.
+
+        호출마다 후보 모델 수만큼의 스레드를 따로 쓰므로, 여러 호출이 동시에 진행되어도 헤지
+        요청이 다른 호출의 요청 뒤에서 기다리지 않습니다. 승자가 정해지면 아직 시작하지 않은
+        요청은 취소하고, 이미 보낸 요청은 취소할 수 없으므로 백그라운드에서 끝나도록 둡니다.
+
+        Args:
+            request_fn (callable): 모델 ID 를 받아 결과를 반환하고, 실패 시 예외를 던지는 함수
+            folder (str, optional): 라우팅 기록에 남길 폴더 이름
+
+        Returns:
+            tuple: (결과, 라우팅 결정 dict)
+
+        Raises:
+            RuntimeError: 모든 모델이 실패한 경우
+        """
+        ordered, probing = self._next_candidates()
+        if probing:
+            print(f"{ordered[0]} 모델 상태 확인을 위해 먼저 요청합니다.")
+        candidates = deque(ordered)
+        attempts = []
+        winner = None
+        result = None
+        pending = set()
+        executor = ThreadPoolExecutor(max_workers=len(ordered))
+
+        try:
+            while winner is None and (candidates or pending):
+                if not pending:
+                    model = candidates.popleft()
+                    pending.add(self._submit(executor, request_fn, model, False, attempts))
+                    delay = self.hedge_delay(model) if self.hedge and candidates else None
+                    if delay is not None:
+                        done, _ = wait(pending, timeout=delay)
+                        if not done:
+                            hedge_model = candidates.popleft()
+                            print(
+                                f"{model} 응답이 p95({delay:.1f}초)를 넘어 {hedge_model}로 헤지 요청"
+                            )
+                            pending.add(
+                                self._submit(executor, request_fn, hedge_model, True, attempts)
+                            )
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                pending -= done
+                for future in done:
+                    self._settle(future)
+                    if winner is None and future.exception() is None:
+                        winner = future.attempt["model"]
+                        result = future.result()
+                    elif future.exception() is not None:
+                        print(f"{future.attempt['model']} 호출 실패: {future.exception()}")
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        decision = {
+            "folder": folder,
+            "winner": winner,
+            "probe": probing,
+            "attempts": [
+                {key: value for key, value in attempt.items() if key != "started"}
+                for attempt in attempts
+                if "latency" in attempt
+            ],
+            "abandoned": [a["model"] for a in attempts if "latency" not in a],
+            "at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self._log_decision(decision)
+
+        if winner is None:
+            raise RuntimeError(f"모든 모델 호출이 실패했습니다: {folder}")
+        return result, decision
+
+    def _log_decision(self, decision):
+        if not self.log_path:
+            return
+        directory = os.path.dirname(self.log_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(decision, ensure_ascii=False) + "\n")
+
+    def summary(self):
+        """
+        모델별 요청 수, 오류율, p50/p95 지연 시간을 반환합니다.
+        """
+        with self._lock:
+            return {
+                model: {
+                    "requests": len(stats.outcomes),
+                    "error_rate": round(stats.error_rate(), 3),
+                    "p50": stats.percentile(0.5),
+                    "p95": stats.percentile(0.95),
+                }
+                for model, stats in self.stats.items()
+            }
+
+    def print_summary(self):
+        print("\n모델별 라우팅 통계:")
+        for model, row in self.summary().items():
+            if not row["requests"]:
+                continue
+            p50 = f"{row['p50']:.1f}초" if row["p50"] is not None else "-"
+            p95 = f"{row['p95']:.1f}초" if row["p95"] is not None else "-"
+            print(
+                f"  {model}: 요청 {row['requests']}건, 오류율 {row['error_rate']:.0%}, "
+                f"p50 {p50}, p95 {p95}"
+            )
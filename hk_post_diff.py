@@ -0,0 +1,166 @@
+import os
+import re
+import json
+import difflib
+from datetime import datetime
+
+
+# 발행 시점의 제목/본문 블록을 저장하는 파일 (수정 모드의 비교 기준)
+PUBLISHED_RECORD_NAME = "published.json"
+
+IMAGE_TAG_PATTERN = re.compile(r"\{(image_\d+\.(?:png|jpg|jpeg|gif))\}")
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+)$")
+# 발행된 글 주소에서 블로그 ID/글 번호 추출
+POST_URL_PATTERNS = (
+    re.compile(r"blogId=([^&#]+).*?logNo=(\d+)"),
+    re.compile(r"blog\.naver\.com/([^/?#]+)/(\d+)"),
+)
+
+
+class UnsupportedEditError(Exception):
+    """
+    블록 추가/삭제나 이미지 변경처럼 제자리 수정으로 반영할 수 없는 변경인 경우 발생합니다.
+    """
+
+
+def clean_body_content(body_content):
+    """
+    첫 줄의 "---" 메타데이터 줄을 제거합니다. (write_naver_blog 와 같은 기준)
+    """
+    return re.sub(r"^---.*?\n", "", body_content, count=1, flags=re.MULTILINE)
+
+
+def plain_text(line):
+    """
+    에디터에 입력되는 한 줄의 실제 텍스트 (제목/인용/굵게/기울임 표시 제거)를 반환합니다.
+    """
+    text = line.strip()
+    heading_match = HEADING_PATTERN.match(text)
+    if heading_match:
+        text = heading_match.group(2)
+    elif text.startswith(">"):
+        text = text[1:].strip()
+    return text.replace("**", "").replace("*", "")
+
+
+def body_blocks(body_content):
+    """
+    본문을 에디터 블록 단위(한 줄 = 한 문단, 이미지 태그 = 이미지 블록)로 나눕니다.
+
+    Returns:
+        list: {"kind": "text" | "image", "text": 문단 텍스트 또는 이미지 파일 이름} 목록
+    """
+    blocks = []
+    for line in body_content.split("\n"):
+        image_match = IMAGE_TAG_PATTERN.search(line)
+        if image_match:
+            blocks.append({"kind": "image", "text": image_match.group(1)})
+        else:
+            blocks.append({"kind": "text", "text": plain_text(line)})
+    return blocks
+
+
+def parse_post_url(*urls):
+    """
+    주소 목록에서 처음 찾은 (블로그 ID, 글 번호) 를 반환합니다. 없으면 (None, None).
+    """
+    for url in urls:
+        for pattern in POST_URL_PATTERNS:
+            match = pattern.search(url or "")
+            if match:
+                return match.group(1), match.group(2)
+    return None, None
+
+
+def load_published_record(folder_path):
+    """
+    폴더의 발행 기록을 읽습니다. 없으면 None 을 반환합니다.
+    """
+    record_path = os.path.join(folder_path, PUBLISHED_RECORD_NAME)
+    if not os.path.exists(record_path):
+        return None
+    with open(record_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_published_record(folder_path, title, body_content, blog_id=None, log_no=None, url=None):
+    """
+    발행(또는 수정)한 제목/본문 블록과 글 주소를 폴더에 저장합니다.
+    """
+    previous = load_published_record(folder_path) or {}
+    record = {
+        "title": title,
+        "blocks": body_blocks(body_content),
+        "blog_id": blog_id or previous.get("blog_id"),
+        "log_no": log_no or previous.get("log_no"),
+        "url": url or previous.get("url"),
+        "published_at": previous.get("published_at") or datetime.now().isoformat(timespec="seconds"),
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    # 임시 파일에 쓴 뒤 교체하여, 다른 폴더와 공유된 파일(하드링크)이 있어도 이 폴더만 바뀌게 함
+    record_path = os.path.join(folder_path, PUBLISHED_RECORD_NAME)
+    temp_path = f"{record_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, record_path)
+    return record
+
+
+def diff_blocks(old_blocks, new_blocks):
+    """
+    발행된 블록과 새 블록을 비교해 제자리에서 바꿀 문단 목록을 만듭니다.
+
+    Returns:
+        list: (문단 순번, 기존 텍스트, 새 텍스트) 목록. 문단 순번은 이미지 블록을 제외한
+            텍스트 문단 기준(0부터)입니다.
+
+    Raises:
+        UnsupportedEditError: 블록 수가 바뀌거나 이미지 블록이 바뀐 경우
+    """
+    old_keys = [(block["kind"], block["text"]) for block in old_blocks]
+    new_keys = [(block["kind"], block["text"]) for block in new_blocks]
+    paragraph_index = []
+    count = 0
+    for block in old_blocks:
+        paragraph_index.append(count if block["kind"] == "text" else None)
+        if block["kind"] == "text":
+            count += 1
+
+    edits = []
+    matcher = difflib.SequenceMatcher(None, old_keys, new_keys, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        if tag != "replace" or i2 - i1 != j2 - j1:
+            raise UnsupportedEditError(
+                f"블록 {i1 + 1}~{i2} 의 구성이 바뀌었습니다 ({tag}, {i2 - i1}개 -> {j2 - j1}개)"
+            )
+        for old_block, new_block, index in zip(
+            old_blocks[i1:i2], new_blocks[j1:j2], paragraph_index[i1:i2]
+        ):
+            if old_block["kind"] != "text" or new_block["kind"] != "text":
+                raise UnsupportedEditError(
+                    f"이미지 블록이 바뀌었습니다: {old_block['text']} -> {new_block['text']}"
+                )
+            edits.append((index, old_block["text"], new_block["text"]))
+    return edits
+
+
+def text_edits(old_text, new_text, merge_gap=3):
+    """
+    문단 하나 안에서 바뀐 구간만 골라냅니다. merge_gap 글자 이하로 떨어진 구간은 하나로 합치고,
+    뒤쪽 구간부터 반환하므로 순서대로 적용해도 앞쪽 위치가 바뀌지 않습니다.
+
+    Returns:
+        list: (시작 위치, 끝 위치, 바꿀 텍스트) 목록
+    """
+    matcher = difflib.SequenceMatcher(None, old_text, new_text, autojunk=False)
+    spans = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        if spans and i1 - spans[-1][1] <= merge_gap:
+            spans[-1] = (spans[-1][0], i2, spans[-1][2], j2)
+        else:
+            spans.append((i1, i2, j1, j2))
+    return [(i1, i2, new_text[j1:j2]) for i1, i2, j1, j2 in reversed(spans)]
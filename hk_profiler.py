@@ -0,0 +1,314 @@
+import os
+import io
+import sys
+import time
+import pstats
+import cProfile
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+
+PROFILE_MODES = ("off", "cprofile", "sample")
+# 스크립트에서 profile_stage(...) 로 표시하는 구간 이름
+PROFILE_STAGES = ("markdown", "tokenize", "generation", "finalize", "browser")
+
+DEFAULT_PROFILE_DIR = "profiles"
+DEFAULT_SAMPLE_INTERVAL = 0.01
+
+
+class RunProfiler:
+    """
+    실행 전체 또는 지정한 구간(stage)만 프로파일링합니다.
+
+    - cprofile: cProfile 결과를 .pstats 와 상위 N개 요약으로 저장 (정확하지만 오버헤드 큼)
+    - sample: 별도 스레드가 주기적으로 스택을 수집하여 collapsed-stack(.collapsed, flamegraph.pl /
+      speedscope 입력 형식)과 상위 N개 요약으로 저장 (오버헤드가 작아 운영 중 상시 사용 가능)
+
+    구간별 경과 시간은 모드와 관계없이 요약에 함께 기록됩니다.
+
+    Args:
+        mode (str): "off", "cprofile", "sample" 중 하나
+        stages (iterable, optional): 프로파일링할 구간 이름. 비어 있으면 실행 전체
+        output_dir (str): 결과 파일 저장 디렉토리
+        top (int): 요약에 표시할 함수 수
+        interval (float): sample 모드의 스택 수집 간격(초)
+        name (str): 결과 파일 이름 앞부분
+    """
+
+    def __init__(
+        self,
+        mode="off",
+        stages=None,
+        output_dir=DEFAULT_PROFILE_DIR,
+        top=20,
+        interval=DEFAULT_SAMPLE_INTERVAL,
+        name="run",
+    ):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"지원하지 않는 프로파일 모드입니다: {mode}")
+        self.mode = mode
+        self.stages = set(stages or ())
+        self.output_dir = output_dir
+        self.top = top
+        self.interval = interval
+        self.name = name
+
+        self.stage_times = defaultdict(float)
+        self.stage_counts = Counter()
+        self.samples = Counter()
+        self.sample_count = 0
+
+        self._stage_stacks = defaultdict(list)  # 스레드 ID -> 진행 중인 구간 목록
+        self._profile = None
+        self._profile_depth = 0
+        self._sampler = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._started_at = None
+        self._owner_thread = None
+
+    @property
+    def enabled(self):
+        return self.mode != "off"
+
+    def _stage_selected(self, name):
+        return not self.stages or name in self.stages
+
+    def start(self):
+        if not self.enabled:
+            return self
+        self._started_at = time.perf_counter()
+        self._owner_thread = threading.get_ident()
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            if not self.stages:
+                self._profile.enable()
+        else:
+            self._sampler = threading.Thread(
+                target=self._sample_loop, name="hk-profiler-sampler", daemon=True
+            )
+            self._sampler.start()
+        return self
+
+    def stop(self):
+        if not self.enabled:
+            return
+        if self.mode == "cprofile":
+            self._profile.disable()
+        else:
+            self._stop_event.set()
+            self._sampler.join()
+        self.write_reports()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    @contextmanager
+    def stage(self, name):
+        """
+        구간 하나를 표시합니다. 중첩 가능하며 스레드별로 따로 추적됩니다.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        thread_id = threading.get_ident()
+        stack = self._stage_stacks[thread_id]
+        stack.append(name)
+        # cProfile 은 enable 한 스레드만 측정하므로 start() 를 호출한 스레드의 구간만 측정
+        profiling = (
+            self.mode == "cprofile"
+            and bool(self.stages)
+            and self._stage_selected(name)
+            and thread_id == self._owner_thread
+        )
+        if profiling:
+            if self._profile_depth == 0:
+                self._profile.enable()
+            self._profile_depth += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if profiling:
+                self._profile_depth -= 1
+                if self._profile_depth == 0:
+                    self._profile.disable()
+            stack.pop()
+            with self._lock:
+                self.stage_times[name] += elapsed
+                self.stage_counts[name] += 1
+
+    def _sample_loop(self):
+        sampler_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id, frame in frames.items():
+                if thread_id == sampler_id:
+                    continue
+                stages = list(self._stage_stacks.get(thread_id, ()))
+                if self.stages and not any(s in self.stages for s in stages):
+                    continue
+                self._record_sample(frame, stages)
+            del frames
+
+    def _record_sample(self, frame, stages):
+        calls = []
+        while frame is not None:
+            code = frame.f_code
+            calls.append(
+                f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            )
+            frame = frame.f_back
+        calls.reverse()
+        stack = ";".join([f"[{s}]" for s in stages] + calls)
+        with self._lock:
+            self.samples[stack] += 1
+            self.sample_count += 1
+
+    def _report_prefix(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return os.path.join(self.output_dir, f"{self.name}_{timestamp}")
+
+    def _stage_summary_lines(self):
+        lines = []
+        if self._started_at is not None:
+            lines.append(f"전체 실행 시간: {time.perf_counter() - self._started_at:.3f}초")
+        for name, total in sorted(self.stage_times.items(), key=lambda x: -x[1]):
+            lines.append(f"  [{name}] {total:.3f}초 ({self.stage_counts[name]}회)")
+        return lines
+
+    def _sample_summary_lines(self):
+        self_counts = Counter()
+        total_counts = Counter()
+        for stack, count in self.samples.items():
+            calls = [c for c in stack.split(";") if not c.startswith("[")]
+            if calls:
+                self_counts[calls[-1]] += count
+            for call in set(calls):
+                total_counts[call] += count
+
+        total = self.sample_count or 1
+        lines = [f"샘플 수: {self.sample_count} (간격 {self.interval * 1000:.0f}ms)"]
+        lines.append(f"상위 {self.top}개 (자체 시간 기준):")
+        for call, count in self_counts.most_common(self.top):
+            lines.append(
+                f"  {count / total:6.1%} 자체 / {total_counts[call] / total:6.1%} 누적  {call}"
+            )
+        return lines
+
+    def write_reports(self):
+        """
+        모드에 맞는 결과 파일과 요약을 저장하고 요약을 출력합니다.
+        """
+        prefix = self._report_prefix()
+        summary_lines = self._stage_summary_lines()
+
+        if self.mode == "cprofile":
+            pstats_path = f"{prefix}.pstats"
+            self._profile.create_stats()
+            if self._profile.stats:
+                self._profile.dump_stats(pstats_path)
+                stream = io.StringIO()
+                stats = pstats.Stats(self._profile, stream=stream)
+                stats.sort_stats("cumulative").print_stats(self.top)
+                summary_lines.append(stream.getvalue())
+                print(f"pstats 저장 완료: {pstats_path}")
+            else:
+                summary_lines.append("측정된 구간이 없어 pstats 를 저장하지 않았습니다.")
+        else:
+            collapsed_path = f"{prefix}.collapsed"
+            with open(collapsed_path, "w", encoding="utf-8") as f:
+                for stack, count in self.samples.most_common():
+                    f.write(f"{stack} {count}\n")
+            summary_lines.extend(self._sample_summary_lines())
+            print(f"collapsed-stack 저장 완료: {collapsed_path} (flamegraph.pl / speedscope)")
+
+        summary_path = f"{prefix}_summary.txt"
+        summary = "\n".join(summary_lines)
+        with open(summary_path, "w", encoding="utf-8") as f:
+            f.write(summary + "\n")
+        print(f"\n프로파일 요약 ({summary_path}):")
+        print(summary)
+
+
+_active_profiler = RunProfiler()
+
+
+def get_profiler():
+    return _active_profiler
+
+
+def install_profiler(profiler):
+    """
+    profile_stage(...) 가 사용할 전역 프로파일러를 지정합니다.
+    """
+    global _active_profiler
+    _active_profiler = profiler
+    return profiler
+
+
+def profile_stage(name):
+    """
+    현재 설치된 프로파일러로 구간을 표시합니다. 프로파일링이 꺼져 있으면 아무 일도 하지 않습니다.
+    """
+    return _active_profiler.stage(name)
+
+
+def add_profile_arguments(parser):
+    """
+    CLI 에 프로파일링 옵션을 추가합니다.
+    """
+    parser.add_argument(
+        "--profile",
+        type=str,
+        choices=PROFILE_MODES,
+        default="off",
+        help="프로파일링 모드 (cprofile: 정밀, sample: 저오버헤드 샘플링)",
+    )
+    parser.add_argument(
+        "--profile_stages",
+        type=str,
+        default="",
+        help=f"프로파일링할 구간(쉼표 구분, 비우면 전체 실행): {','.join(PROFILE_STAGES)}",
+    )
+    parser.add_argument(
+        "--profile_dir", type=str, default=DEFAULT_PROFILE_DIR, help="프로파일 결과 저장 디렉토리"
+    )
+    parser.add_argument(
+        "--profile_top", type=int, default=20, help="요약에 표시할 상위 함수 수"
+    )
+    parser.add_argument(
+        "--profile_interval",
+        type=float,
+        default=DEFAULT_SAMPLE_INTERVAL,
+        help="sample 모드의 스택 수집 간격(초)",
+    )
+
+
+def profiler_from_args(args, name):
+    """
+    add_profile_arguments 로 받은 옵션으로 프로파일러를 만들고 전역으로 설치합니다.
+    """
+    stages = [s.strip() for s in args.profile_stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in PROFILE_STAGES]
+    if unknown:
+        print(f"알 수 없는 프로파일 구간은 무시됩니다: {', '.join(unknown)}")
+    return install_profiler(
+        RunProfiler(
+            mode=args.profile,
+            stages=[s for s in stages if s in PROFILE_STAGES],
+            output_dir=args.profile_dir,
+            top=args.profile_top,
+            interval=args.profile_interval,
+            name=name,
+        )
+    )
@@ -0,0 +1,157 @@
+import os
+import re
+import threading
+from functools import lru_cache
+from string import Template
+
+
+# 사용자 프롬프트 템플릿에 채워 넣는 기본 값 (폴더/CLI 값이 없을 때 사용)
+DEFAULT_VARIABLES = {
+    "brand": "누수종결",
+    "keyword": "누수탐지",
+    "phone": "010-8678-2065",
+    "city": "",
+}
+# 지역명을 알 때만 프롬프트에 넣는 지시문 (모르면 빈 지역명을 지시하지 않도록 생략)
+CITY_INSTRUCTION = '본문의 지역명은 "{city}", '
+
+# downloadBlog.js 폴더 이름: [지역]키워드_blogId_logNo (앞에 [처리전]/[처리후] 가 붙을 수 있음)
+FOLDER_NAME_PATTERN = re.compile(r"^\[([^\]]+)\]([^_]*)_")
+STATUS_MARK_PATTERN = re.compile(r"\[처리[전후]\]")
+
+
+class PromptTemplate:
+    """
+    시스템/사용자 프롬프트를 한 번 컴파일해 두고 폴더별 변수만 채워 메시지를 만듭니다.
+
+    사용자 프롬프트는 첫 번째 `${변수}` 앞까지를 고정 접두부로 분리합니다.
+    메시지는 항상 [시스템 프롬프트, 고정 접두부 + 변수가 채워진 나머지 + 원문] 순서이므로
+    배치 내 모든 요청의 앞부분이 바이트 단위로 같아 제공자 측 프롬프트 캐시가 적중합니다.
+    """
+
+    def __init__(self, system_text, user_text):
+        self.system_text = system_text
+        self.user_text = user_text
+
+        match = Template.pattern.search(user_text)
+        while match is not None and match.group("escaped") is not None:
+            match = Template.pattern.search(user_text, match.end())
+        split_at = match.start() if match is not None else len(user_text)
+
+        self.static_prefix = user_text[:split_at]
+        self.dynamic_part = Template(user_text[split_at:])
+        self.variable_names = sorted(
+            {
+                m.group("named") or m.group("braced")
+                for m in Template.pattern.finditer(user_text)
+                if m.group("named") or m.group("braced")
+            }
+        )
+
+    def render_user_prompt(self, variables=None):
+        """
+        변수가 채워진 사용자 프롬프트(원문 제외)를 반환합니다. 빠진 변수는 기본 값으로 채웁니다.
+        """
+        values = dict(DEFAULT_VARIABLES)
+        values.update({k: v for k, v in (variables or {}).items() if v})
+        values["city_instruction"] = (
+            CITY_INSTRUCTION.format(city=values["city"]) if values["city"] else ""
+        )
+        return self.static_prefix + self.dynamic_part.substitute(values)
+
+    def render_messages(self, source_content, variables=None):
+        """
+        Chat Completions 요청에 사용할 메시지 목록을 만듭니다.
+        """
+        return [
+            {"role": "system", "content": self.system_text},
+            {
+                "role": "user",
+                "content": f"{self.render_user_prompt(variables)}\n\n{source_content}",
+            },
+        ]
+
+
+@lru_cache(maxsize=None)
+def _compile_prompt_template(system_prompt_path, user_prompt_path):
+    with open(system_prompt_path, "r", encoding="utf-8") as file:
+        system_text = file.read()
+    with open(user_prompt_path, "r", encoding="utf-8") as file:
+        user_text = file.read()
+    return PromptTemplate(system_text, user_text)
+
+
+def load_prompt_template(system_prompt_path, user_prompt_path):
+    """
+    프롬프트 파일을 읽어 컴파일한 템플릿을 반환합니다. 같은 경로는 프로세스 내에서 한 번만 읽습니다.
+
+    상대 경로는 스크립트 위치 기준으로 해석합니다.
+
+    Raises:
+        FileNotFoundError: 프롬프트 파일이 없는 경우
+    """
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    return _compile_prompt_template(
+        os.path.join(current_dir, system_prompt_path),
+        os.path.join(current_dir, user_prompt_path),
+    )
+
+
+def folder_variables(folder_path, overrides=None):
+    """
+    폴더 이름에서 지역(city)과 키워드(keyword)를 추출하고 CLI 값(overrides)을 덮어씌웁니다.
+    """
+    variables = {}
+    folder_name = STATUS_MARK_PATTERN.sub("", os.path.basename(folder_path))
+    match = FOLDER_NAME_PATTERN.match(folder_name)
+    if match:
+        variables["city"] = match.group(1).strip()
+        if match.group(2).strip():
+            variables["keyword"] = match.group(2).strip()
+    variables.update({k: v for k, v in (overrides or {}).items() if v})
+    return variables
+
+
+def _field(obj, name):
+    # SDK 응답 객체와 Batch 결과 dict 를 모두 지원
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+class CacheUsageReport:
+    """
+    요청별 usage 를 누적하여 캐시 적중/미적중 입력 토큰 수를 보고합니다.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def add(self, usage):
+        if usage is None:
+            return
+        details = _field(usage, "prompt_tokens_details")
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += _field(usage, "prompt_tokens") or 0
+            self.cached_tokens += _field(details, "cached_tokens") or 0
+            self.completion_tokens += _field(usage, "completion_tokens") or 0
+
+    @property
+    def uncached_tokens(self):
+        return self.prompt_tokens - self.cached_tokens
+
+    def print_summary(self):
+        if not self.requests:
+            return
+        ratio = self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0
+        print(
+            f"\n입력 토큰: 캐시 적중 {self.cached_tokens} / 미적중 {self.uncached_tokens} "
+            f"(적중률 {ratio:.0%}), 출력 토큰 {self.completion_tokens}, 요청 {self.requests}건"
+        )
@@ -6,6 +6,29 @@ import markdown
 import platform
 import pandas as pd  # 엑셀 파일 처리를 위해 pandas 추가
 import sys
+import argparse
+from contextlib import nullcontext
+
+from hk_catalog import (
+    DEFAULT_CLAIM_TIMEOUT,
+    FolderCatalog,
+    STATUS_FAILED,
+    STATUS_GENERATED,
+    STATUS_POSTED,
+    STATUS_POSTING,
+)
+from hk_flight_recorder import FlightRecorder, add_flight_recorder_arguments, recorder_from_args
+from hk_post_diff import (
+    UnsupportedEditError,
+    body_blocks,
+    clean_body_content,
+    diff_blocks,
+    load_published_record,
+    parse_post_url,
+    save_published_record,
+    text_edits,
+)
+from hk_profiler import add_profile_arguments, profile_stage, profiler_from_args
 
 # Import custom browser configuration if available
 try:
@@ -134,7 +157,137 @@ def markdown_to_naver_html(markdown_text):
     return html
 
 
-def write_naver_blog(markdown_content=None, folder_path=None, location=None):
+def tokenize_inline_markdown(line):
+    """
+    한 줄의 굵은 텍스트(**text**)와 기울임 텍스트(*text*)를 분리합니다.
+
+    Returns:
+        list: ("normal" | "bold" | "italic", 텍스트) 튜플 목록
+    """
+    segments = []
+    current_position = 0
+
+    # ** 패턴과 * 패턴 모두 찾기
+    combined_pattern = re.compile(r"(\*\*(.*?)\*\*|\*(.*?)\*)")
+    for match in combined_pattern.finditer(line):
+        start, end = match.span()
+        # 이전 일반 텍스트 추가
+        if start > current_position:
+            segments.append(("normal", line[current_position:start]))
+
+        matched_text = match.group(0)
+        if matched_text.startswith("**"):
+            # 굵은 텍스트 (** **)
+            segments.append(("bold", match.group(2)))
+        else:
+            # 기울임 텍스트 (* *)
+            segments.append(("italic", match.group(3)))
+
+        current_position = end
+
+    # 남은 텍스트 처리
+    if current_position < len(line):
+        segments.append(("normal", line[current_position:]))
+
+    return segments
+
+
+BLOG_URL = "https://blog.naver.com/lvup-"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
+
+
+def new_browser_context(browser, **options):
+    """포스팅/수정에 공통으로 사용하는 브라우저 컨텍스트 생성 (options 로 storage_state 등 추가)"""
+    return browser.new_context(
+        user_agent=USER_AGENT,
+        viewport={"width": 1920, "height": 1080},
+        device_scale_factor=1,
+        locale="ko-KR",
+        timezone_id="Asia/Seoul",
+        permissions=["geolocation"],
+        java_script_enabled=True,
+        is_mobile=False,
+        has_touch=False,
+        **options,
+    )
+
+
+def open_blog_home(page, recorder=None):
+    """블로그에 접속하고 필요하면 로그인한 뒤 mainFrame 을 반환"""
+    # 네이버 블로그 접속
+    print("Navigating to Naver blog...")
+    if recorder:
+        recorder.action("navigate")
+    page.goto(BLOG_URL)
+    page.wait_for_load_state("networkidle")
+
+    # iframe으로 정확하게 접근
+    main_frame = page.frame("mainFrame")
+    if not main_frame:
+        raise ValueError("Could not find mainFrame")
+
+    # 이미 로그인되어 있는지 확인
+    already_logged_in = False
+    try:
+        write_button = main_frame.get_by_role("link", name="글쓰기")
+        if write_button.count() > 0:
+            print("Already logged in")
+            already_logged_in = True
+    except Exception as e:
+        print(f"Login status check error: {e}")
+        already_logged_in = False
+
+    # 로그인이 필요한 경우에만 로그인 진행
+    if not already_logged_in:
+        print("Logging in...")
+        if recorder:
+            recorder.action("login")
+        main_frame.get_by_role("link", name="로그인").click()
+        page.get_by_role("textbox", name="아이디 또는 전화번호").click()
+        page.get_by_role("textbox", name="아이디 또는 전화번호").fill(
+            "eastkim64"
+        )
+        page.get_by_role("textbox", name="아이디 또는 전화번호").press("Tab")
+        page.get_by_role("textbox", name="비밀번호").fill("gusl@()%")
+        page.locator("#log\\.login").click()
+        page.wait_for_load_state("networkidle")
+        main_frame = page.frame("mainFrame")
+        print("Login completed")
+    return main_frame
+
+
+def publish_post(editor_frame):
+    """발행 버튼과 발행 확인 버튼을 차례로 클릭. 발행을 확인했으면 True"""
+    publish_btn = editor_frame.get_by_text("발행", exact=True)
+    if publish_btn.count() > 0:
+        publish_btn.click(force=True)
+        print("Publish button clicked")
+        time.sleep(2)
+
+        confirm_button = editor_frame.get_by_text("발행", exact=True)
+        if confirm_button.count() >= 2:
+            confirm_button.nth(1).click(force=True)
+            print("Publish confirmed")
+            time.sleep(5)
+            return True
+    return False
+
+
+def save_published_post(page, folder_path, title, body_content):
+    """발행한 제목/본문 블록과 글 주소를 폴더에 저장 (수정 모드의 비교 기준)"""
+    try:
+        urls = [page.url] + [frame.url for frame in page.frames]
+        blog_id, log_no = parse_post_url(*urls)
+        save_published_record(
+            folder_path, title, body_content, blog_id=blog_id, log_no=log_no, url=page.url
+        )
+        print(f"Published record saved (blogId={blog_id}, logNo={log_no})")
+    except Exception as e:
+        # 발행 자체는 끝났으므로 기록 실패로 결과를 바꾸지 않음
+        print(f"Failed to save published record: {e}")
+
+
+def write_naver_blog(markdown_content=None, folder_path=None, location=None, recorder=None):
     """
     네이버 블로그에 포스팅하는 함수
 
@@ -142,6 +295,7 @@ def write_naver_blog(markdown_content=None, folder_path=None, location=None):
         markdown_content (str, optional): 마크다운 형식의 콘텐츠. Defaults to None.
         folder_path (str, optional): 포스팅할 콘텐츠가 있는 폴더 경로. Defaults to None.
         location (str, optional): 변경할 지역명. Defaults to None.
+        recorder (FlightRecorder, optional): 실패 기록기. 없으면 기본 설정으로 생성합니다.
 
     Returns:
         bool: 포스팅 성공 여부
@@ -201,13 +355,23 @@ def write_naver_blog(markdown_content=None, folder_path=None, location=None):
         blockquote_start_key = "Control+Alt+Q"
         blockquote_end_key = "Control+Alt+H"
 
+    # 마크다운이 주어지지 않으면 output.md 내용을 사용
+    if markdown_content is None:
+        with open(output_md_path, "r", encoding="utf-8") as output_file:
+            markdown_content = output_file.read()
+
     # 마크다운을 네이버 블로그 HTML로 변환
-    html_content = markdown_to_naver_html(markdown_content)
+    with profile_stage("markdown"):
+        html_content = markdown_to_naver_html(markdown_content)
 
-    with sync_playwright() as p:
+    if recorder is None:
+        recorder = FlightRecorder(folder_path)
+
+    browser = None
+    context = None
+    with sync_playwright() as p, profile_stage("browser"):
         try:
             # 브라우저 실행 설정
-            user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
             print("Launching browser...")
 
             # 브라우저 시작 전 디버그 정보 출력
@@ -218,19 +382,10 @@ def write_naver_blog(markdown_content=None, folder_path=None, location=None):
                 slow_mo=100,
             )
 
-            context = browser.new_context(
-                user_agent=user_agent,
-                viewport={"width": 1920, "height": 1080},
-                device_scale_factor=1,
-                locale="ko-KR",
-                timezone_id="Asia/Seoul",
-                permissions=["geolocation"],
-                java_script_enabled=True,
-                is_mobile=False,
-                has_touch=False,
-            )
+            context = new_browser_context(browser)
 
             page = context.new_page()
+            recorder.attach(context, page)
             print("Browser launched successfully")
 
             # 현재 업로드할 이미지 경로 변수
@@ -248,55 +403,11 @@ def write_naver_blog(markdown_content=None, folder_path=None, location=None):
 
             page.on("filechooser", handle_file_chooser)
 
-            # 네이버 블로그 접속
-            print("Navigating to Naver blog...")
-            page.goto("https://blog.naver.com/lvup-")
-            page.wait_for_load_state("networkidle")
-
-            # iframe으로 정확하게 접근
-            main_frame = page.frame("mainFrame")
-            if not main_frame:
-                raise ValueError("Could not find mainFrame")
-
-            # 이미 로그인되어 있는지 확인
-            already_logged_in = False
-            try:
-                write_button = main_frame.get_by_role("link", name="글쓰기")
-                if write_button.count() > 0:
-                    print("Already logged in")
-                    already_logged_in = True
-            except Exception as e:
-                print(f"Login status check error: {e}")
-                already_logged_in = False
-
-            # 로그인이 필요한 경우에만 로그인 진행
-            if not already_logged_in:
-                print("Logging in...")
-                main_frame.get_by_role("link", name="로그인").click()
-                page.get_by_role("textbox", name="아이디 또는 전화번호").click()
-                page.get_by_role("textbox", name="아이디 또는 전화번호").fill(
-                    "eastkim64"
-                )
-                page.get_by_role("textbox", name="아이디 또는 전화번호").press("Tab")
-                page.get_by_role("textbox", name="비밀번호").fill("gusl@()%")
-                page.locator("#log\\.login").click()
-                page.wait_for_load_state("networkidle")
-                main_frame = page.frame("mainFrame")
-                print("Login completed")
-
-
-            page.pause()
-            page.goto("https://cafe.naver.com/ca-fe/cafes/12175294/articles/write?boardType=L")
-            page.get_by_role("button", name="게시판을 선택해 주세요").click()
-            page.get_by_role("button", name="회원사진첩").click()
-            page.get_by_role("textbox", name="제목을 입력해 주세요").click()
-            page.get_by_role("textbox", name="제목을 입력해 주세요").fill("제목 테스트")
-            page.get_by_role("paragraph").filter(has_text="내용을 입력하세요").click()
-            page.keyboard.type("test")
-            page.get_by_role("button", name="임시등록").click()
+            main_frame = open_blog_home(page, recorder)
 
             # 글쓰기 링크 클릭
             print("Clicking write button...")
+            recorder.action("open_editor")
             main_frame.get_by_role("link", name="글쓰기").click()
             page.wait_for_load_state("networkidle")
             time.sleep(2)
@@ -324,6 +435,7 @@ def write_naver_blog(markdown_content=None, folder_path=None, location=None):
                         print(f"No writing in progress popup detected: {e}")
 
                     # 제목 입력
+                    recorder.action("title")
                     print("Reading title file...")
                     with open(title_file_path, "r", encoding="utf-8") as title_file:
                         title_content = title_file.read().strip()
@@ -337,13 +449,14 @@ def write_naver_blog(markdown_content=None, folder_path=None, location=None):
                         time.sleep(1)
 
                     # 본문 입력
+                    recorder.action("body")
                     print("Reading content file...")
                     with open(output_md_path, "r", encoding="utf-8") as output_file:
                         body_content = output_file.read()
                     print("Content file read successfully")
                     
                     # 첫줄에 "---"로 시작하는 문구가 있으면 제거 (예: "---변경된 글 ([오산]누수탐지_witch172_223709101360)")
-                    body_content = re.sub(r'^---.*?\n', '', body_content, count=1, flags=re.MULTILINE)
+                    body_content = clean_body_content(body_content)
                     print("Removed metadata line if present")
 
                     # 본문 입력 처리
@@ -503,43 +616,8 @@ def write_naver_blog(markdown_content=None, folder_path=None, location=None):
 
                                     else:
                                         # 굵은 텍스트 처리 (**text**)과 기울임 텍스트 처리 (*text*)
-                                        segments = []
-                                        current_position = 0
-
-                                        # ** 패턴과 * 패턴 모두 찾기
-                                        combined_pattern = re.compile(
-                                            r"(\*\*(.*?)\*\*|\*(.*?)\*)"
-                                        )
-                                        for match in combined_pattern.finditer(line):
-                                            start, end = match.span()
-                                            # 이전 일반 텍스트 추가
-                                            if start > current_position:
-                                                segments.append(
-                                                    (
-                                                        "normal",
-                                                        line[current_position:start],
-                                                    )
-                                                )
-
-                                            matched_text = match.group(0)
-                                            if matched_text.startswith("**"):
-                                                # 굵은 텍스트 (** **)
-                                                segments.append(
-                                                    ("bold", match.group(2))
-                                                )
-                                            else:
-                                                # 기울임 텍스트 (* *)
-                                                segments.append(
-                                                    ("italic", match.group(3))
-                                                )
-
-                                            current_position = end
-
-                                        # 남은 텍스트 처리
-                                        if current_position < len(line):
-                                            segments.append(
-                                                ("normal", line[current_position:])
-                                            )
+                                        with profile_stage("tokenize"):
+                                            segments = tokenize_inline_markdown(line)
 
                                         # 일반 텍스트 처리 (스타일 포함)
                                         for segment_type, segment_text in segments:
@@ -609,6 +687,7 @@ def write_naver_blog(markdown_content=None, folder_path=None, location=None):
                         # 주소가 있는 경우에만 장소 추가 진행
                         if address:
                             print(f"주소({address})를 사용하여 장소 추가를 시작합니다.")
+                            recorder.action("place")
                             page.locator(
                                 'iframe[name="mainFrame"]'
                             ).content_frame.get_by_role(
@@ -658,46 +737,240 @@ def write_naver_blog(markdown_content=None, folder_path=None, location=None):
 
                         # 발행 버튼 클릭
                         print("Clicking publish button...")
+                        recorder.action("publish")
                         close_button = editor_frame.get_by_role(
                             "button", name="닫기"
                         ).nth(1)
                         close_button.click()
                         time.sleep(1)
 
-                        publish_btn = editor_frame.get_by_text("발행", exact=True)
-                        if publish_btn.count() > 0:
-                            publish_btn.click(force=True)
-                            print("Publish button clicked")
-                            time.sleep(2)
-
-                            confirm_button = editor_frame.get_by_text(
-                                "발행", exact=True
+                        if publish_post(editor_frame):
+                            save_published_post(
+                                page, folder_path, title_content, body_content
                             )
-                            if confirm_button.count() >= 2:
-                                confirm_button.nth(1).click(force=True)
-                                print("Publish confirmed")
-                                time.sleep(5)
-                                return True
+                            return True
 
                 except Exception as e:
                     print(f"Error during content entry: {e}")
                     raise
 
+            recorder.capture_failure("발행 확인 단계에 도달하지 못했습니다")
             return False
 
         except Exception as e:
             print(f"Error during blog posting: {e}")
+            recorder.capture_failure(e)
             raise
         finally:
-            # 리소스 정리
-            for p in context.pages:
-                p.close()
-            browser.close()
+            # 리소스 정리 (실패 기록이 없으면 trace 는 저장하지 않고 버림)
+            recorder.finish()
+            if context is not None:
+                for p in context.pages:
+                    p.close()
+            if browser is not None:
+                browser.close()
             print("Browser closed")
 
     return True
 
 
+# 수정 모드에서 본문 문단 (이미지 설명 문단 제외) / 제목 문단
+BODY_PARAGRAPH_SELECTOR = ".se-main-container .se-component:not(.se-image) .se-text-paragraph"
+TITLE_PARAGRAPH_SELECTOR = ".se-documentTitle .se-text-paragraph"
+
+# 문단 안의 [start, end) 글자 범위를 선택 (에디터가 넣는 폭 없는 공백은 세지 않음)
+SELECT_TEXT_RANGE_SCRIPT = """
+(element, [start, end]) => {
+    const walker = document.createTreeWalker(element, NodeFilter.SHOW_TEXT);
+    const chars = [];
+    let last = null;
+    let node;
+    while ((node = walker.nextNode())) {
+        for (let i = 0; i < node.textContent.length; i++) {
+            if (node.textContent[i] !== "\\u200b") chars.push([node, i]);
+        }
+        if (node.textContent.length) last = [node, node.textContent.length];
+    }
+    const locate = (offset) => (offset < chars.length ? chars[offset] : last);
+    const from = locate(start);
+    const to = locate(end);
+    if (!from || !to) return false;
+    const range = document.createRange();
+    range.setStart(from[0], from[1]);
+    range.setEnd(to[0], to[1]);
+    const selection = element.ownerDocument.getSelection();
+    selection.removeAllRanges();
+    selection.addRange(range);
+    return true;
+}
+"""
+
+
+def _normalize_paragraph_text(text):
+    return text.replace("\u200b", "").strip()
+
+
+def plan_post_update(folder_path):
+    """
+    발행 기록과 현재 title.txt / output.md 를 비교해 수정 계획을 만듭니다.
+
+    Returns:
+        dict: 수정 계획 (바뀐 내용이 없으면 None)
+
+    Raises:
+        ValueError: 발행 기록이나 필수 파일이 없는 경우
+        UnsupportedEditError: 제자리 수정으로 반영할 수 없는 변경인 경우
+    """
+    record = load_published_record(folder_path)
+    if record is None or not record.get("log_no"):
+        raise ValueError(f"Published record not found (full re-post required): {folder_path}")
+
+    with open(os.path.join(folder_path, "title.txt"), "r", encoding="utf-8") as title_file:
+        title = title_file.read().strip()
+    with open(os.path.join(folder_path, "output.md"), "r", encoding="utf-8") as output_file:
+        body_content = clean_body_content(output_file.read())
+
+    edits = diff_blocks(record["blocks"], body_blocks(body_content))
+    title_changed = title != record.get("title")
+    if not edits and not title_changed:
+        return None
+    return {
+        "folder": folder_path,
+        "record": record,
+        "title": title,
+        "body": body_content,
+        "edits": edits,
+        "title_changed": title_changed,
+    }
+
+
+def _find_paragraph(texts, expected_index, old_text):
+    # 같은 텍스트의 문단 중 발행 당시 순번과 가장 가까운 문단
+    candidates = [i for i, text in enumerate(texts) if text == old_text]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda i: abs(i - expected_index))
+
+
+def _apply_text_edits(page, paragraph, old_text, new_text):
+    # 바뀐 글자 구간만 선택해 다시 입력 (나머지 글자와 서식은 그대로 유지)
+    paragraph.click()
+    for start, end, replacement in text_edits(old_text, new_text):
+        if not paragraph.evaluate(SELECT_TEXT_RANGE_SCRIPT, [start, end]):
+            raise ValueError(f"Could not select text range {start}-{end} in: {old_text}")
+        if replacement:
+            page.keyboard.type(replacement)
+        else:
+            page.keyboard.press("Backspace")
+
+
+def apply_post_update(page, plan, recorder):
+    """
+    발행된 글을 에디터에서 열어 계획된 문단만 고친 뒤 다시 발행합니다.
+    """
+    record = plan["record"]
+    recorder.action("open_editor")
+    page.goto(
+        f"https://blog.naver.com/PostUpdateForm.naver?blogId={record['blog_id']}&logNo={record['log_no']}"
+    )
+    page.wait_for_load_state("networkidle")
+    time.sleep(2)
+    editor_frame = page.frame("mainFrame") or page.main_frame
+
+    recorder.action("edit")
+    if plan["title_changed"]:
+        title_paragraph = editor_frame.locator(TITLE_PARAGRAPH_SELECTOR).first
+        current_title = _normalize_paragraph_text(title_paragraph.inner_text())
+        if current_title != record["title"]:
+            raise ValueError(f"Title in editor does not match published record: {current_title}")
+        _apply_text_edits(page, title_paragraph, record["title"], plan["title"])
+        print(f"Title updated: {plan['title']}")
+
+    paragraphs = editor_frame.locator(BODY_PARAGRAPH_SELECTOR)
+    texts = [_normalize_paragraph_text(text) for text in paragraphs.all_inner_texts()]
+    for expected_index, old_text, new_text in plan["edits"]:
+        index = _find_paragraph(texts, expected_index, old_text)
+        if index is None:
+            raise ValueError(f"Paragraph not found in editor: {old_text}")
+        _apply_text_edits(page, paragraphs.nth(index), old_text, new_text)
+        texts[index] = new_text
+    print(f"{len(plan['edits'])} paragraph(s) updated")
+
+    recorder.action("publish")
+    if not publish_post(editor_frame):
+        raise ValueError("Could not confirm publish after update")
+    save_published_record(plan["folder"], plan["title"], plan["body"])
+
+
+def update_naver_blogs(folder_paths, recorder_factory=None):
+    """
+    이미 발행한 글들을 현재 title.txt / output.md 기준으로 바뀐 문단만 제자리에서 수정합니다.
+
+    로그인은 한 번만 하고, 글마다 로그인 상태를 복사한 새 컨텍스트에서 수정합니다.
+    블록 추가/삭제나 이미지 변경처럼 제자리 수정이 불가능한 글은 실패로 남기므로
+    write_naver_blog 로 다시 발행해야 합니다.
+
+    Args:
+        folder_paths (list): 수정할 폴더 경로 목록 (발행 시 저장된 published.json 필요)
+        recorder_factory (callable, optional): 폴더 경로를 받아 FlightRecorder 를 반환
+
+    Returns:
+        dict: 폴더 경로 -> (성공 여부, 메시지)
+    """
+    results = {}
+    plans = []
+    for folder_path in folder_paths:
+        try:
+            plan = plan_post_update(folder_path)
+        except (OSError, ValueError, UnsupportedEditError) as e:
+            print(f"Skipping {folder_path}: {e}")
+            results[folder_path] = (False, str(e))
+            continue
+        if plan is None:
+            print(f"No changes since publish: {folder_path}")
+            results[folder_path] = (True, "no changes")
+        else:
+            plans.append(plan)
+
+    if not plans:
+        return results
+
+    with sync_playwright() as p, profile_stage("browser"):
+        browser = p.chromium.launch(headless=False, slow_mo=100)
+        try:
+            login_context = new_browser_context(browser)
+            try:
+                open_blog_home(login_context.new_page())
+                storage_state = login_context.storage_state()
+            finally:
+                login_context.close()
+
+            for plan in plans:
+                folder_path = plan["folder"]
+                recorder = (
+                    recorder_factory(folder_path) if recorder_factory else FlightRecorder(folder_path)
+                )
+                context = new_browser_context(browser, storage_state=storage_state)
+                try:
+                    page = context.new_page()
+                    recorder.attach(context, page)
+                    apply_post_update(page, plan, recorder)
+                    message = f"{len(plan['edits'])} paragraph(s) updated"
+                    print(f"Post updated: {folder_path} ({message})")
+                    results[folder_path] = (True, message)
+                except Exception as e:
+                    print(f"Error during post update: {folder_path}: {e}")
+                    recorder.capture_failure(e)
+                    results[folder_path] = (False, str(e))
+                finally:
+                    recorder.finish()
+                    context.close()
+        finally:
+            browser.close()
+            print("Browser closed")
+    return results
+
+
 def save_markdown_to_file(markdown_content, output_file="output.txt"):
     """마크다운 내용을 텍스트 파일로 저장"""
     # ```markdown 및 ``` 태그 제거
@@ -716,12 +989,170 @@ def save_markdown_to_file(markdown_content, output_file="output.txt"):
     return markdown_content
 
 
-if __name__ == "__main__":
-    # 테스트용 폴더 경로와 지역
-    test_folder_path = "20250402_2031_gz73gj1_223751315667"
-    test_location = "김포"  # 테스트 지역명
+def _catalog_error(error, recorder):
+    # 카탈로그 오류 메시지에 실패 기록 묶음 경로를 함께 남김
+    message = str(error) if error else None
+    if recorder is not None and recorder.bundle_path:
+        message = f"{message or '발행 실패'} (실패 기록: {recorder.bundle_path})"
+    return message
+
+
+def _resolve_folder_path(folder_path):
+    # 카탈로그(migrate)와 같은 기준(현재 디렉토리)으로 먼저 해석하고,
+    # 없으면 write_naver_blog 와 같은 기준(스크립트 위치)으로 해석
+    if os.path.isabs(folder_path):
+        return folder_path
+    if os.path.exists(folder_path):
+        return os.path.abspath(folder_path)
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), folder_path)
+
+
+def run_updates(args):
+    """--update 로 받은 폴더들의 발행된 글을 바뀐 문단만 수정하고 결과를 기록"""
+    folder_paths = [_resolve_folder_path(folder) for folder in args.update]
+    recorders = {}
+
+    def recorder_factory(folder_path):
+        recorders[folder_path] = recorder_from_args(args, folder_path)
+        return recorders[folder_path]
+
+    with profiler_from_args(args, "hk_write_blog"):
+        results = update_naver_blogs(folder_paths, recorder_factory=recorder_factory)
+
+    updated = sum(1 for ok, _ in results.values() if ok)
+    print(f"Post update finished: {updated} succeeded, {len(results) - updated} failed")
+    for folder_path, (ok, message) in results.items():
+        if not ok:
+            print(f"  failed: {folder_path} ({message})")
+
+    if args.catalog:
+        with FolderCatalog(args.catalog) as catalog:
+            for folder_path, (ok, message) in results.items():
+                # 발행 기록이 없는 폴더는 발행된 적이 없으므로 카탈로그 상태를 건드리지 않음
+                record = load_published_record(folder_path)
+                if not record or not record.get("log_no"):
+                    continue
+                # 수정에 실패해도 글은 발행된 상태이므로 posted 로 두고 오류만 남김
+                recorder = recorders.get(folder_path)
+                error = None
+                if not ok:
+                    error = _catalog_error(f"update failed: {message}", recorder)
+                catalog.record_transition(folder_path, folder_path, STATUS_POSTED, error=error)
+
+
+def post_folder(args, folder_path, location, catalog=None):
+    """폴더 하나를 포스팅하고 카탈로그를 사용 중이면 결과를 기록"""
+    recorder = recorder_from_args(args, folder_path)
+    error = None
+    result = False
     try:
-        result = write_naver_blog(folder_path=test_folder_path, location=test_location)
+        result = write_naver_blog(folder_path=folder_path, location=location, recorder=recorder)
         print(f"Blog posting {'successful' if result else 'failed'}")
     except Exception as e:
+        error = e
         print(f"Error in main: {e}")
+
+    if catalog is not None:
+        catalog.record_transition(
+            folder_path,
+            folder_path,
+            STATUS_POSTED if result else STATUS_FAILED,
+            error=_catalog_error(error, recorder),
+        )
+    return result
+
+
+def run_claimed_posts(args):
+    """--claim 으로 카탈로그에서 포스팅 대기 폴더를 가져와 차례로 포스팅"""
+    with FolderCatalog(args.catalog) as catalog:
+        claimed = catalog.claim(
+            STATUS_GENERATED,
+            region=args.region,
+            limit=args.claim,
+            stale_after=args.claim_timeout,
+        )
+        print(f"카탈로그에서 {len(claimed)}개 폴더를 가져왔습니다.")
+        claimed_paths = [row["path"] for row in claimed]
+        try:
+            with profiler_from_args(args, "hk_write_blog"):
+                for row in claimed:
+                    if not os.path.isdir(row["path"]):
+                        catalog.release(
+                            row["path"], STATUS_FAILED, error="폴더가 존재하지 않습니다"
+                        )
+                        continue
+                    post_folder(args, row["path"], row["region"] or args.location, catalog)
+        finally:
+            # 예외/중단 시 완료·실패로 기록되지 않은 폴더는 다른 작업자가 가져갈 수 있게 되돌림
+            released = catalog.release_unfinished(
+                claimed_paths,
+                STATUS_GENERATED,
+                STATUS_POSTING,
+                error="포스팅이 끝나지 않아 대기 상태로 되돌림",
+            )
+            if released:
+                print(f"끝나지 않은 폴더 {released}개를 대기 상태로 되돌렸습니다.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="네이버 블로그 포스팅")
+    # 테스트용 폴더 경로와 지역
+    parser.add_argument(
+        "--folder",
+        type=str,
+        default="20250402_2031_gz73gj1_223751315667",
+        help="포스팅할 콘텐츠가 있는 폴더 경로",
+    )
+    parser.add_argument("--location", type=str, default="김포", help="지역명")
+    parser.add_argument(
+        "--catalog",
+        type=str,
+        default=None,
+        help="포스팅 결과를 기록할 카탈로그(SQLite) 경로",
+    )
+    parser.add_argument(
+        "--claim",
+        type=int,
+        default=0,
+        help="--catalog 사용 시 --folder 대신 포스팅 대기 폴더를 N개 가져와 차례로 포스팅",
+    )
+    parser.add_argument(
+        "--region", type=str, default=None, help="--claim 시 가져올 지역"
+    )
+    parser.add_argument(
+        "--claim_timeout",
+        type=float,
+        default=DEFAULT_CLAIM_TIMEOUT,
+        help="--claim 시 이 시간(초)이 지나도록 끝나지 않은 posting 폴더를 먼저 되돌림",
+    )
+    parser.add_argument(
+        "--update",
+        type=str,
+        nargs="+",
+        default=None,
+        metavar="FOLDER",
+        help="이미 발행한 글을 새로 발행하지 않고 바뀐 문단만 수정할 폴더 목록",
+    )
+    add_profile_arguments(parser)
+    add_flight_recorder_arguments(parser)
+    args = parser.parse_args()
+
+    if args.claim > 0 and not args.catalog:
+        parser.error("--claim 은 --catalog 와 함께 사용해야 합니다")
+
+    if args.update:
+        run_updates(args)
+        return
+    if args.claim > 0:
+        run_claimed_posts(args)
+        return
+
+    folder_path = _resolve_folder_path(args.folder)
+    catalog = FolderCatalog(args.catalog) if args.catalog else None
+    with catalog if catalog is not None else nullcontext():
+        with profiler_from_args(args, "hk_write_blog"):
+            post_folder(args, folder_path, args.location, catalog)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,37 +4,84 @@ import argparse
 from pathlib import Path
 import traceback
 import re
+import json
+import time
+from contextlib import nullcontext
+from datetime import datetime
 
+from hk_catalog import (
+    DEFAULT_CLAIM_TIMEOUT,
+    FolderCatalog,
+    STATUS_GENERATING,
+    STATUS_FAILED,
+    STATUS_GENERATED,
+    STATUS_PENDING,
+    folder_content_hash,
+)
+from hk_chunking import SectionGenerationError, generate_in_sections
+from hk_model_router import ModelRouter, DEFAULT_MODELS_PATH
+from hk_profiler import add_profile_arguments, profile_stage, profiler_from_args
+from hk_prompt_template import (
+    DEFAULT_VARIABLES,
+    CacheUsageReport,
+    folder_variables,
+    load_prompt_template,
+)
 
-def replace_phone_numbers(content):
+
+# 생성 대기 폴더 / 생성 완료 폴더 표시
+PENDING_MARK = "[처리전]"
+DONE_MARK = "[처리후]"
+# downloadBlog.js 가 저장하는 원문 파일
+SOURCE_FILE_NAME = "content_with_images.txt"
+
+# Batch API 상태 중 더 이상 진행되지 않는 상태
+BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+# 제목/본문/태그를 한 번에 받는 구조화 출력 스키마
+STRUCTURED_POST_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string", "description": "블로그 글 제목 (한 줄)"},
+        "body": {"type": "string", "description": "마크다운 형식의 본문"},
+        "tags": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "# 없이 작성한 태그 목록 (없으면 빈 배열)",
+        },
+    },
+    "required": ["title", "body", "tags"],
+    "additionalProperties": False,
+}
+STRUCTURED_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "blog_post", "strict": True, "schema": STRUCTURED_POST_SCHEMA},
+}
+# 구조화 출력 시 시스템 프롬프트 뒤에 붙이는 안내 (모든 요청에 동일하므로 캐시 접두부 유지)
+STRUCTURED_OUTPUT_INSTRUCTION = (
+    "결과는 title(글 제목 한 줄), body(요청사항에 맞게 작성한 본문), "
+    "tags(본문과 어울리는 태그, 없으면 빈 배열) 를 가진 JSON 객체로 반환하세요."
+)
+
+
+def replace_phone_numbers(content, new_phone=DEFAULT_VARIABLES["phone"]):
     """
     전화번호를 찾아서 지정된 번호로 교체합니다.
     """
     # 전화번호 패턴 (010-XXXX-XXXX)
     phone_pattern = r"010-\d{4}-\d{4}"
-    # 교체할 전화번호
-    new_phone = "010-8678-2065"
 
     # 전화번호 교체
     modified_content = re.sub(phone_pattern, new_phone, content)
     return modified_content
 
 
-def read_prompt_file(system_prompt_path, user_prompt_path):
+def read_prompt_template(system_prompt_path, user_prompt_path):
     """
-    프롬프트 파일을 읽어 내용을 반환합니다.
+    프롬프트 파일을 읽어 컴파일된 템플릿을 반환합니다. (프로세스 내에서 한 번만 읽음)
     """
     try:
-        # 상위 디렉토리로 이동하는 횟수 조정
-        current_dir = os.path.dirname(os.path.abspath(__file__))  # 현재 파일의 디렉토리
-        print(current_dir)
-        system_prompt_absolute_path = os.path.join(current_dir, system_prompt_path)
-        user_prompt_absolute_path = os.path.join(current_dir, user_prompt_path)
-        with open(system_prompt_absolute_path, "r", encoding="utf-8") as file:
-            system_content = file.read()
-        with open(user_prompt_absolute_path, "r", encoding="utf-8") as file:
-            user_content = file.read()
-        return system_content, user_content
+        return load_prompt_template(system_prompt_path, user_prompt_path)
     except FileNotFoundError as e:
         print(f"오류: '{e.filename}' 파일을 찾을 수 없습니다.")
         exit(1)
@@ -43,74 +90,525 @@ def read_prompt_file(system_prompt_path, user_prompt_path):
         exit(1)
 
 
-def generate_content(system_prompt, user_prompt, api_key, model="gpt-4o"):
+def read_prompt_file(system_prompt_path, user_prompt_path):
     """
-    OpenAI API를 사용하여 콘텐츠를 생성합니다.
+    프롬프트 파일을 읽어 내용을 반환합니다.
+    """
+    template = read_prompt_template(system_prompt_path, user_prompt_path)
+    return template.system_text, template.user_text
+
+
+def find_processing_folders(base_dir="."):
+    """
+    base_dir 바로 아래에서 이름에 [처리전]이 포함된 폴더 목록을 반환합니다.
+    """
+    if not os.path.isdir(base_dir):
+        return []
+    folders = [
+        os.path.join(base_dir, name)
+        for name in sorted(os.listdir(base_dir))
+        if PENDING_MARK in name and os.path.isdir(os.path.join(base_dir, name))
+    ]
+    return folders
+
+
+def read_source_content(folder_path):
+    """
+    폴더의 원문(content_with_images.txt)을 읽어 반환합니다. 없으면 None을 반환합니다.
+    """
+    source_path = os.path.join(folder_path, SOURCE_FILE_NAME)
+    if not os.path.exists(source_path):
+        print(f"원문 파일을 찾을 수 없습니다: {source_path}")
+        return None
+    with open(source_path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def build_completion_body(messages, model, structured=False):
+    """
+    동기 호출과 Batch API 요청이 공유하는 Chat Completions 요청 본문을 만듭니다.
+    """
+    body = {
+        "model": model,
+        "messages": messages,
+        "temperature": 0.75,
+        "max_tokens": 16384,
+    }
+    if structured:
+        body["messages"] = with_structured_instruction(messages)
+        body["response_format"] = STRUCTURED_RESPONSE_FORMAT
+    return body
+
+
+def with_structured_instruction(messages):
+    """
+    시스템 메시지 뒤에 구조화 출력 안내를 붙인 메시지 목록을 반환합니다.
+    """
+    messages = [dict(message) for message in messages]
+    for message in messages:
+        if message["role"] == "system":
+            message["content"] = f"{message['content']}\n\n{STRUCTURED_OUTPUT_INSTRUCTION}"
+            break
+    return messages
+
+
+def parse_structured_post(text):
+    """
+    구조화 출력(JSON 문자열)을 스키마에 맞게 검증하여 반환합니다.
+
+    Returns:
+        dict: {"title": str, "body": str, "tags": list}
+
+    Raises:
+        ValueError: JSON 이 아니거나 스키마에 맞지 않는 경우
     """
     try:
-        client = openai.OpenAI(api_key=api_key)
+        data = json.loads(text)
+    except (TypeError, json.JSONDecodeError) as e:
+        raise ValueError(f"구조화 응답이 JSON 이 아닙니다: {e}")
+    if not isinstance(data, dict):
+        raise ValueError("구조화 응답이 객체가 아닙니다")
+
+    extra = set(data) - set(STRUCTURED_POST_SCHEMA["properties"])
+    if extra:
+        raise ValueError(f"구조화 응답에 알 수 없는 필드가 있습니다: {', '.join(sorted(extra))}")
+    for field in ("title", "body"):
+        if not isinstance(data.get(field), str) or not data[field].strip():
+            raise ValueError(f"구조화 응답의 '{field}' 가 비어 있거나 문자열이 아닙니다")
+    tags = data.get("tags") or []
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        raise ValueError("구조화 응답의 'tags' 는 문자열 배열이어야 합니다")
+
+    return {
+        "title": data["title"].strip().splitlines()[0].strip(),
+        "body": data["body"],
+        "tags": [tag.strip().lstrip("#") for tag in tags if tag.strip().lstrip("#")],
+    }
+
+
+def request_completion(client, messages, model, usage=None):
+    """
+    Chat Completions 요청을 한 번 보내고 생성된 콘텐츠를 반환합니다. 실패 시 예외를 그대로 던집니다.
+
+    usage(CacheUsageReport) 가 주어지면 캐시 적중/미적중 입력 토큰을 누적합니다.
+    """
+    with profile_stage("generation"):
+        response = client.chat.completions.create(**build_completion_body(messages, model))
+    if usage is not None:
+        usage.add(response.usage)
+    return response.choices[0].message.content
 
+
+def request_structured_post(client, messages, model, usage=None):
+    """
+    제목/본문/태그를 하나의 구조화 응답으로 요청하고 검증된 dict 를 반환합니다.
+
+    Raises:
+        ValueError: 응답이 스키마에 맞지 않는 경우
+    """
+    with profile_stage("generation"):
         response = client.chat.completions.create(
-            model=model,
-            messages=[
+            **build_completion_body(messages, model, structured=True)
+        )
+    if usage is not None:
+        usage.add(response.usage)
+    message = response.choices[0].message
+    if getattr(message, "refusal", None):
+        raise ValueError(f"모델이 응답을 거부했습니다: {message.refusal}")
+    return parse_structured_post(message.content)
+
+
+def generate_content(
+    system_prompt, user_prompt, api_key, model="gpt-4o", base_url=None, usage=None
+):
+    """
+    OpenAI API를 사용하여 콘텐츠를 생성합니다.
+    """
+    try:
+        client = openai.OpenAI(api_key=api_key, base_url=base_url)
+
+        return request_completion(
+            client,
+            [
                 {
                     "role": "system",
                     "content": system_prompt,
                 },
                 {"role": "user", "content": user_prompt},
             ],
-            temperature=0.75,
-            max_tokens=16384,
+            model,
+            usage=usage,
         )
-
-        return response.choices[0].message.content
     except Exception as e:
         print(f"OpenAI API 호출 중 오류 발생: {e}")
         exit(1)
 
 
-def save_generated_content_to_folders(content, folders):
+def section_messages(template, section, index, total, variables=None):
+    """
+    구간 생성용 메시지를 만듭니다. 구간 안내는 원문 뒤에 붙여 고정 접두부를 유지합니다.
+    """
+    note = (
+        f"(전체 {total}개 구간 중 {index}번째 구간입니다. "
+        "이 구간만 같은 줄 수와 이미지 위치를 유지하여 작성하세요.)"
+    )
+    return template.render_messages(f"{section}\n\n{note}", variables)
+
+
+def postprocess_content(content, phone=DEFAULT_VARIABLES["phone"]):
+    """
+    생성된 콘텐츠에서 HTML 태그를 제거하고 전화번호를 교체합니다.
+    """
+    # HTML 태그 제거
+    content = re.sub(r"<[^>]+>", "", content)
+    # 전화번호 교체
+    return replace_phone_numbers(content, phone)
+
+
+def finalize_folder(folder_path, content, title=None, tags=None, catalog=None):
+    """
+    후처리된 콘텐츠를 폴더에 저장하고 폴더 이름을 [처리후]로 변경합니다.
+
+    Args:
+        folder_path (str): 콘텐츠를 저장할 폴더 경로
+        content (str): 후처리가 끝난 콘텐츠
+        title (str, optional): 함께 생성된 제목 (title.txt 로 저장)
+        tags (list, optional): 함께 생성된 태그 (tags.txt 로 저장)
+        catalog (FolderCatalog, optional): 새 경로와 상태를 기록할 카탈로그
+
+    Returns:
+        str: 이름이 변경된 폴더 경로
+    """
+    with profile_stage("finalize"):
+        output_path = os.path.join(folder_path, "output.md")
+        processed_content_path = os.path.join(
+            folder_path, "content_with_images_processed.txt"
+        )
+
+        # 항상 콘텐츠 새로 저장 (기존 파일이 있어도 덮어씀)
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        print(f"생성된 콘텐츠 저장 완료: {output_path}")
+
+        # content_with_images_processed.txt 파일 저장
+        with open(processed_content_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        print(f"처리된 콘텐츠 저장 완료: {processed_content_path}")
+
+        # 구조화 출력으로 함께 생성된 제목/태그 저장
+        if title:
+            title_path = os.path.join(folder_path, "title.txt")
+            with open(title_path, "w", encoding="utf-8") as f:
+                f.write(title)
+            print(f"제목 저장 완료: {title_path}")
+        if tags:
+            tags_path = os.path.join(folder_path, "tags.txt")
+            with open(tags_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(tags))
+            print(f"태그 저장 완료: {tags_path}")
+
+        # 폴더 이름 변경 ([처리전] -> [처리후])
+        folder_name = os.path.basename(folder_path)
+        new_folder_name = folder_name.replace(PENDING_MARK, DONE_MARK)
+        new_folder_path = os.path.join(os.path.dirname(folder_path), new_folder_name)
+
+        os.rename(folder_path, new_folder_path)
+        print(f"폴더 이름 변경 완료: {folder_path} -> {new_folder_path}")
+
+        if catalog is not None:
+            catalog.record_transition(
+                folder_path,
+                new_folder_path,
+                STATUS_GENERATED,
+                content_hash=folder_content_hash(new_folder_path),
+            )
+        return new_folder_path
+
+
+def record_failure(catalog, folder_path, error):
+    """
+    카탈로그를 사용 중이면 폴더를 실패 상태로 기록합니다.
+    """
+    if catalog is not None:
+        catalog.release(folder_path, STATUS_FAILED, error=str(error))
+
+
+def save_generated_content_to_folders(
+    content, folders, phone=DEFAULT_VARIABLES["phone"], catalog=None
+):
     """
     생성된 콘텐츠를 각 폴더에 저장하고 폴더 이름을 [처리후]로 변경합니다.
 
     Args:
         content (str): 저장할 생성된 콘텐츠
         folders (list): 콘텐츠를 저장할 폴더 경로 목록
+        phone (str): 본문의 전화번호를 교체할 번호
+        catalog (FolderCatalog, optional): 상태를 기록할 카탈로그
+    """
+    content = postprocess_content(content, phone)
+    for folder_path in folders:
+        try:
+            finalize_folder(folder_path, content, catalog=catalog)
+        except Exception as e:
+            print(f"결과 저장 및 폴더 이름 변경 오류: {e}")
+            record_failure(catalog, folder_path, e)
+
+
+def save_structured_post_to_folder(
+    post, folder_path, phone=DEFAULT_VARIABLES["phone"], catalog=None
+):
+    """
+    구조화 출력으로 받은 제목/본문/태그를 폴더에 함께 저장하고 폴더 이름을 [처리후]로 변경합니다.
+
+    Returns:
+        str: 후처리된 본문
     """
     try:
-        # HTML 태그 제거
-        content = re.sub(r"<[^>]+>", "", content)
+        content = postprocess_content(post["body"], phone)
+        title = re.sub(r"<[^>]+>", "", post["title"])
+        finalize_folder(
+            folder_path, content, title=title, tags=post.get("tags"), catalog=catalog
+        )
+        return content
+    except Exception as e:
+        print(f"결과 저장 및 폴더 이름 변경 오류: {e}")
+        record_failure(catalog, folder_path, e)
+        return None
+
+
+def build_batch_requests(folders, template, model, overrides=None, structured=False):
+    """
+    각 폴더의 생성 요청을 Batch API 입력(JSONL) 한 줄씩으로 만듭니다.
+
+    custom_id 에는 폴더 이름을 사용하므로 결과를 폴더로 되돌려 놓을 때 그대로 매칭됩니다.
+    모든 요청의 메시지는 템플릿의 고정 접두부로 시작하므로 프롬프트 캐시를 공유합니다.
+
+    Returns:
+        list: Batch API 요청 dict 목록
+    """
+    requests = []
+    for folder_path in folders:
+        source_content = read_source_content(folder_path)
+        if source_content is None:
+            continue
+        messages = template.render_messages(
+            source_content, folder_variables(folder_path, overrides)
+        )
+        requests.append(
+            {
+                "custom_id": os.path.basename(folder_path),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": build_completion_body(messages, model, structured),
+            }
+        )
+    return requests
+
+
+def write_batch_file(requests, batch_dir):
+    """
+    Batch API 요청 목록을 JSONL 파일로 저장하고 경로를 반환합니다.
+    """
+    os.makedirs(batch_dir, exist_ok=True)
+    batch_file_path = os.path.join(
+        batch_dir, f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    )
+    with open(batch_file_path, "w", encoding="utf-8") as f:
+        for request in requests:
+            f.write(json.dumps(request, ensure_ascii=False) + "\n")
+    print(f"배치 입력 파일 저장 완료: {batch_file_path} ({len(requests)}건)")
+    return batch_file_path
 
-        for folder_path in folders:
-            output_path = os.path.join(folder_path, "output.md")
-            processed_content_path = os.path.join(
-                folder_path, "content_with_images_processed.txt"
-            )
 
-            # 전화번호 교체 로직 추가
-            content = replace_phone_numbers(content)
+def submit_batch(client, batch_file_path):
+    """
+    배치 입력 파일을 업로드하고 배치 작업을 생성합니다.
 
-            # 항상 콘텐츠 새로 저장 (기존 파일이 있어도 덮어씀)
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(content)
-            print(f"생성된 콘텐츠 저장 완료: {output_path}")
+    Returns:
+        str: 생성된 배치 ID
+    """
+    with open(batch_file_path, "rb") as f:
+        uploaded = client.files.create(file=f, purpose="batch")
+    batch = client.batches.create(
+        input_file_id=uploaded.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    print(f"배치 제출 완료: {batch.id} (입력 파일 {uploaded.id})")
+    return batch.id
 
-            # content_with_images_processed.txt 파일 저장
-            with open(processed_content_path, "w", encoding="utf-8") as f:
-                f.write(content)
-            print(f"처리된 콘텐츠 저장 완료: {processed_content_path}")
 
-            # 폴더 이름 변경 ([처리전] -> [처리후])
-            folder_name = os.path.basename(folder_path)
-            new_folder_name = folder_name.replace("[처리전]", "[처리후]")
-            new_folder_path = os.path.join(
-                os.path.dirname(folder_path), new_folder_name
+def wait_for_batch(client, batch_id, poll_interval=60, timeout=None, on_poll=None):
+    """
+    배치가 종료 상태가 될 때까지 주기적으로 조회합니다.
+    on_poll 이 주어지면 조회할 때마다 호출합니다. (카탈로그의 claimed_at 갱신 등)
+
+    Returns:
+        배치 객체. timeout 을 넘기면 None을 반환합니다.
+    """
+    started = time.monotonic()
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if on_poll is not None:
+            on_poll()
+        counts = getattr(batch, "request_counts", None)
+        if counts is not None:
+            print(
+                f"배치 상태: {batch.status} "
+                f"(완료 {counts.completed}/{counts.total}, 실패 {counts.failed})"
             )
+        else:
+            print(f"배치 상태: {batch.status}")
 
-            os.rename(folder_path, new_folder_path)
-            print(f"폴더 이름 변경 완료: {folder_path} -> {new_folder_path}")
-    except Exception as e:
-        print(f"결과 저장 및 폴더 이름 변경 오류: {e}")
+        if batch.status in BATCH_TERMINAL_STATUSES:
+            return batch
+        if timeout is not None and time.monotonic() - started > timeout:
+            print(f"배치 대기 시간 초과: {batch_id} (--batch_id 로 이어서 조회할 수 있습니다)")
+            return None
+        time.sleep(poll_interval)
+
+
+def parse_batch_results(output_text, usage=None):
+    """
+    배치 결과(JSONL) 를 custom_id 별 생성 콘텐츠로 변환합니다.
+
+    Returns:
+        dict: {custom_id: 생성 콘텐츠}. 실패한 요청은 포함하지 않습니다.
+    """
+    results = {}
+    for line in output_text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        custom_id = record.get("custom_id")
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            print(f"배치 요청 실패: {custom_id} - {record.get('error') or response}")
+            continue
+        if usage is not None:
+            usage.add((response.get("body") or {}).get("usage"))
+        try:
+            results[custom_id] = response["body"]["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            print(f"배치 응답 형식 오류: {custom_id}")
+    return results
+
+
+def read_batch_custom_ids(client, batch):
+    """
+    배치 입력 파일에서 제출된 custom_id 목록을 읽습니다. (--batch_id 로 이어서 조회할 때 사용)
+    """
+    if not getattr(batch, "input_file_id", None):
+        return set()
+    input_text = client.files.content(batch.input_file_id).text
+    return {
+        json.loads(line).get("custom_id")
+        for line in input_text.splitlines()
+        if line.strip()
+    }
+
+
+def run_batch_generation(
+    folders,
+    template,
+    api_key,
+    model="gpt-4o",
+    base_url=None,
+    batch_dir="batches",
+    batch_id=None,
+    poll_interval=60,
+    timeout=None,
+    overrides=None,
+    usage=None,
+    structured=False,
+    catalog=None,
+    client=None,
+):
+    """
+    대기 중인 폴더들의 생성 요청을 Batch API 로 한꺼번에 처리합니다.
+
+    batch_id 가 주어지면 새로 제출하지 않고 기존 배치의 결과만 조회합니다.
+    결과는 custom_id(폴더 이름)로 폴더에 매칭하여 동기 모드와 같은 후처리/폴더 이름 변경을 거칩니다.
+    client 를 주면 api_key/base_url 대신 그 클라이언트를 사용합니다. (테스트용 가짜 클라이언트 등)
+
+    Returns:
+        dict: {원래 폴더 경로: 후처리된 콘텐츠}
+    """
+    if client is None:
+        client = openai.OpenAI(api_key=api_key, base_url=base_url)
+
+    submitted_ids = None
+    if batch_id is None:
+        requests = build_batch_requests(folders, template, model, overrides, structured)
+        if not requests:
+            print("배치로 보낼 요청이 없습니다.")
+            return {}
+        batch_file_path = write_batch_file(requests, batch_dir)
+        batch_id = submit_batch(client, batch_file_path)
+        submitted_ids = {request["custom_id"] for request in requests}
+
+    on_poll = None
+    if catalog is not None:
+        # 완료 기한(24h)까지 기다리는 동안 다른 --claim 작업자가 오래된 작업으로 회수하지 않도록 함
+        def on_poll():
+            catalog.heartbeat(folders, STATUS_GENERATING)
+
+    with profile_stage("generation"):
+        batch = wait_for_batch(client, batch_id, poll_interval, timeout, on_poll)
+    if batch is None:
+        # 아직 끝나지 않은 배치: 폴더는 [처리전] 그대로 두고 --batch_id 로 이어서 반영
+        return {}
+    if batch.status != "completed":
+        print(f"배치가 완료되지 않았습니다: {batch_id} ({batch.status})")
+
+    if submitted_ids is None:
+        submitted_ids = read_batch_custom_ids(client, batch)
+
+    results = {}
+    if getattr(batch, "error_file_id", None):
+        error_text = client.files.content(batch.error_file_id).text
+        parse_batch_results(error_text)
+    if getattr(batch, "output_file_id", None):
+        output_text = client.files.content(batch.output_file_id).text
+        results = parse_batch_results(output_text, usage)
+
+    folders_by_id = {os.path.basename(folder): folder for folder in folders}
+    generated = {}
+    for custom_id, content in results.items():
+        folder_path = folders_by_id.get(custom_id)
+        if folder_path is None:
+            print(f"배치 결과에 해당하는 [처리전] 폴더가 없습니다: {custom_id}")
+            continue
+        phone = folder_variables(folder_path, overrides).get(
+            "phone", DEFAULT_VARIABLES["phone"]
+        )
+        if structured:
+            try:
+                post = parse_structured_post(content)
+            except ValueError as e:
+                print(f"구조화 응답 검증 실패: {custom_id} - {e}")
+                record_failure(catalog, folder_path, e)
+                continue
+            content = save_structured_post_to_folder(post, folder_path, phone, catalog)
+            if content is not None:
+                generated[folder_path] = content
+            continue
+        try:
+            content = postprocess_content(content, phone)
+            finalize_folder(folder_path, content, catalog=catalog)
+            generated[folder_path] = content
+        except Exception as e:
+            print(f"결과 저장 및 폴더 이름 변경 오류: {e}")
+            record_failure(catalog, folder_path, e)
+
+    # 종료된 배치에서 결과를 받지 못한 폴더 (실패 줄, 누락된 custom_id, 만료로 처리되지 않은 요청)
+    for custom_id, folder_path in folders_by_id.items():
+        if custom_id not in results and custom_id in submitted_ids:
+            record_failure(catalog, folder_path, f"배치 {batch_id} ({batch.status}) 결과 없음")
+
+    print(f"배치 결과 반영 완료: {len(generated)}/{len(results)}건")
+    return generated
 
 
 def main():
@@ -118,13 +616,13 @@ def main():
     parser.add_argument(
         "--system_prompt",
         type=str,
-        default="docs/system_prompt.md",
+        default="docs/system_prompt/system_prompt.md",
         help="시스템 프롬프트 파일 경로",
     )
     parser.add_argument(
         "--user_prompt",
         type=str,
-        default="docs/user_prompt.md",
+        default="docs/user_prompt/user_prompt.md",
         help="사용자 프롬프트 파일 경로",
     )
 
@@ -137,22 +635,285 @@ def main():
     parser.add_argument(
         "--model", type=str, default="gpt-4o", help="사용할 OpenAI 모델"
     )
+    parser.add_argument(
+        "--base_dir", type=str, default=".", help="[처리전] 폴더를 찾을 디렉토리"
+    )
+    parser.add_argument(
+        "--base_url",
+        type=str,
+        default=None,
+        help="OpenAI API 주소 (로컬 모의 서버 등, 기본값은 공식 API)",
+    )
+    parser.add_argument(
+        "--batch", action="store_true", help="Batch API로 모든 [처리전] 폴더를 한꺼번에 생성"
+    )
+    parser.add_argument(
+        "--batch_id", type=str, default=None, help="이미 제출한 배치의 결과만 조회하여 반영"
+    )
+    parser.add_argument(
+        "--batch_dir", type=str, default="batches", help="배치 입력 파일 저장 디렉토리"
+    )
+    parser.add_argument(
+        "--poll_interval", type=float, default=60, help="배치 상태 조회 간격(초)"
+    )
+    parser.add_argument(
+        "--batch_timeout",
+        type=float,
+        default=None,
+        help="배치 대기 최대 시간(초), 초과 시 종료 후 --batch_id 로 이어서 조회",
+    )
+    parser.add_argument(
+        "--route",
+        action="store_true",
+        help="models.json 의 모델들로 지연 시간/오류율 기반 라우팅 및 장애 시 전환",
+    )
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="--route 사용 시 p95 를 넘긴 요청에 대해 다음 모델로 헤지 요청",
+    )
+    parser.add_argument(
+        "--models", type=str, default=DEFAULT_MODELS_PATH, help="모델 목록 파일 경로"
+    )
+    parser.add_argument(
+        "--brand", type=str, default=None, help="프롬프트에 넣을 업체명 (기본값: 누수종결)"
+    )
+    parser.add_argument(
+        "--keyword",
+        type=str,
+        default=None,
+        help="프롬프트에 넣을 키워드 (기본값: 폴더 이름의 키워드)",
+    )
+    parser.add_argument(
+        "--phone", type=str, default=None, help="본문에 사용할 전화번호"
+    )
+    parser.add_argument(
+        "--structured",
+        action="store_true",
+        help="제목/본문/태그를 하나의 JSON 응답으로 생성하여 title.txt 와 output.md 를 함께 저장",
+    )
+    parser.add_argument(
+        "--catalog",
+        type=str,
+        default=None,
+        help="단계별 상태를 기록할 카탈로그(SQLite) 경로 (hk_catalog.py migrate 로 생성)",
+    )
+    parser.add_argument(
+        "--claim",
+        type=int,
+        default=0,
+        help="--catalog 사용 시 디렉토리를 훑지 않고 대기 폴더를 N개 가져와 처리",
+    )
+    parser.add_argument(
+        "--region", type=str, default=None, help="--claim 시 가져올 지역"
+    )
+    parser.add_argument(
+        "--claim_timeout",
+        type=float,
+        default=DEFAULT_CLAIM_TIMEOUT,
+        help="--claim 시 이 시간(초)이 지나도록 끝나지 않은 generating 폴더를 먼저 되돌림",
+    )
+    parser.add_argument(
+        "--chunked",
+        action="store_true",
+        help="원문을 이미지 위치 기준 구간으로 나눠 동시에 생성하고 실패한 구간만 재생성",
+    )
+    parser.add_argument(
+        "--chunk_workers", type=int, default=4, help="--chunked 사용 시 동시 생성 구간 수"
+    )
+    parser.add_argument(
+        "--chunk_attempts", type=int, default=3, help="--chunked 사용 시 구간별 최대 시도 횟수"
+    )
+    add_profile_arguments(parser)
     args = parser.parse_args()
+    if args.chunked and (args.structured or args.batch or args.batch_id):
+        parser.error("--chunked 는 --structured, --batch 와 함께 사용할 수 없습니다")
 
-    # 프롬프트 파일 읽기
-    system_prompt, user_prompt = read_prompt_file(args.system_prompt, args.user_prompt)
+    with profiler_from_args(args, "hk_write_post"):
+        run_generation(args)
 
-    # 콘텐츠 생성
-    print(f"{args.model} 모델을 사용하여 콘텐츠 생성 중...")
-    generated_content, processing_folders = generate_content_with_openai(
-        args.system_prompt, args.user_prompt, args.model
-    )
 
-    # 폴더가 존재하면 결과 저장
-    if processing_folders:
-        save_generated_content_to_folders(generated_content, processing_folders)
-    else:
-        print("[처리전] 폴더가 없어 결과를 저장하지 않습니다.")
+def run_generation(args):
+    """
+    main() 에서 받은 옵션으로 [처리전] 폴더들의 콘텐츠를 생성합니다.
+    """
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        print("오류: OPENAI_API_KEY 환경 변수가 설정되지 않았습니다.")
+        exit(1)
+
+    # 프롬프트 템플릿 읽기 (한 번만 읽고 컴파일)
+    template = read_prompt_template(args.system_prompt, args.user_prompt)
+    overrides = {"brand": args.brand, "keyword": args.keyword, "phone": args.phone}
+    phone = args.phone or DEFAULT_VARIABLES["phone"]
+    usage = CacheUsageReport()
+
+    catalog = FolderCatalog(args.catalog) if args.catalog else None
+    with catalog if catalog is not None else nullcontext():
+        claimed = []
+        if catalog is not None and args.claim > 0 and not args.batch_id:
+            claimed = catalog.claim(
+                STATUS_PENDING,
+                region=args.region,
+                limit=args.claim,
+                stale_after=args.claim_timeout,
+            )
+            processing_folders = []
+            for row in claimed:
+                if os.path.isdir(row["path"]):
+                    processing_folders.append(row["path"])
+                else:
+                    record_failure(catalog, row["path"], "폴더가 존재하지 않습니다")
+            print(f"카탈로그에서 {len(processing_folders)}개 폴더를 가져왔습니다.")
+        else:
+            # --batch_id 로 이어서 조회할 때는 custom_id(폴더 이름)로 매칭하므로 디렉토리를 훑음
+            processing_folders = find_processing_folders(args.base_dir)
+        if not processing_folders:
+            print("[처리전] 폴더가 없어 결과를 저장하지 않습니다.")
+            return
+
+        claimed_paths = processing_folders if claimed else []
+        try:
+            generate_folders(
+                args, processing_folders, template, overrides, phone, usage, catalog, api_key
+            )
+        finally:
+            # 예외/중단 시 완료·실패로 기록되지 않은 폴더는 다른 작업자가 가져갈 수 있게 되돌림
+            if claimed_paths:
+                released = catalog.release_unfinished(
+                    claimed_paths,
+                    STATUS_PENDING,
+                    STATUS_GENERATING,
+                    error="생성이 끝나지 않아 대기 상태로 되돌림",
+                )
+                if released:
+                    print(f"끝나지 않은 폴더 {released}개를 대기 상태로 되돌렸습니다.")
+
+
+def generate_folders(args, processing_folders, template, overrides, phone, usage, catalog, api_key):
+    """
+    run_generation 이 고른 폴더들을 배치/라우팅/구간/구조화/기본 모드 중 하나로 생성합니다.
+    """
+    if args.batch or args.batch_id:
+        print(f"{args.model} 모델 배치 모드로 {len(processing_folders)}개 폴더 처리 중...")
+        run_batch_generation(
+            processing_folders,
+            template,
+            api_key,
+            model=args.model,
+            base_url=args.base_url,
+            batch_dir=args.batch_dir,
+            batch_id=args.batch_id,
+            poll_interval=args.poll_interval,
+            timeout=args.batch_timeout,
+            overrides=overrides,
+            usage=usage,
+            structured=args.structured,
+            catalog=catalog,
+        )
+        usage.print_summary()
+        return
+
+    client = openai.OpenAI(api_key=api_key, base_url=args.base_url)
+    router = None
+    if args.route:
+        try:
+            router = ModelRouter.from_models_file(
+                args.models,
+                preferred=args.model,
+                structured=args.structured,
+                hedge=args.hedge,
+            )
+        except (OSError, ValueError) as e:
+            print(f"모델 라우팅을 설정할 수 없습니다: {args.models} ({e})")
+            return
+        print(f"모델 라우팅 사용: {', '.join(router.models)}")
+
+    generated_content = None
+    for folder_path in processing_folders:
+        source_content = read_source_content(folder_path)
+        if source_content is None:
+            record_failure(catalog, folder_path, "원문 파일이 없습니다")
+            continue
+
+        # 콘텐츠 생성 (고정 접두부가 같은 메시지 순서 유지)
+        variables = folder_variables(folder_path, overrides)
+        messages = template.render_messages(source_content, variables)
+
+        # 헤지에서 진 요청은 다음 폴더로 넘어간 뒤에 실행될 수 있으므로 메시지를 지금 묶어 둠
+        def request_fn(model, messages=messages):
+            if args.structured:
+                return request_structured_post(client, messages, model, usage)
+            return request_completion(client, messages, model, usage)
+
+        def section_request_fn(section, index, total):
+            section_msgs = section_messages(template, section, index, total, variables)
+            if router is not None:
+                content, _ = router.call(
+                    lambda model: request_completion(client, section_msgs, model, usage),
+                    folder=f"{os.path.basename(folder_path)}#{index}",
+                )
+                return content
+            return request_completion(client, section_msgs, args.model, usage)
+
+        if args.chunked:
+            print(f"구간별 동시 생성 중... ({folder_path})")
+            try:
+                generated = generate_in_sections(
+                    source_content,
+                    section_request_fn,
+                    max_workers=args.chunk_workers,
+                    max_attempts=args.chunk_attempts,
+                )
+            except SectionGenerationError as e:
+                print(f"콘텐츠 생성 실패, 다음 폴더로 넘어갑니다: {e}")
+                record_failure(catalog, folder_path, e)
+                continue
+        elif router is not None:
+            print(f"라우팅을 통해 콘텐츠 생성 중... ({folder_path})")
+            try:
+                # 구조화 응답 검증 실패도 실패로 간주되어 다음 모델로 넘어감
+                generated, decision = router.call(
+                    request_fn, folder=os.path.basename(folder_path)
+                )
+            except RuntimeError as e:
+                # 한 폴더의 실패로 전체 실행을 중단하지 않음
+                print(f"콘텐츠 생성 실패, 다음 폴더로 넘어갑니다: {e}")
+                record_failure(catalog, folder_path, e)
+                continue
+            print(f"{decision['winner']} 모델 응답 사용")
+        elif args.structured:
+            print(f"{args.model} 모델로 제목과 본문을 함께 생성 중... ({folder_path})")
+            try:
+                generated = request_fn(args.model)
+            except Exception as e:
+                print(f"구조화 생성 실패, 다음 폴더로 넘어갑니다: {e}")
+                record_failure(catalog, folder_path, e)
+                continue
+        else:
+            print(f"{args.model} 모델을 사용하여 콘텐츠 생성 중... ({folder_path})")
+            try:
+                generated = request_fn(args.model)
+            except Exception as e:
+                # 한 폴더의 API 오류로 전체 실행을 중단하지 않음
+                print(f"OpenAI API 호출 중 오류 발생, 다음 폴더로 넘어갑니다: {e}")
+                record_failure(catalog, folder_path, e)
+                continue
+
+        # 결과 저장
+        if args.structured:
+            generated_content = save_structured_post_to_folder(
+                generated, folder_path, phone, catalog
+            )
+        else:
+            generated_content = generated
+            save_generated_content_to_folders(
+                generated_content, [folder_path], phone, catalog
+            )
+
+    if router is not None:
+        router.print_summary()
+    usage.print_summary()
 
     # 결과 출력
     print("\n생성된 콘텐츠:")
@@ -162,7 +923,7 @@ def main():
 
     # None이 아닐 경우에만 파일에 저장
     if generated_content is not None:
-        # 결과 파일 저장 (특정 경로에 저장)
+        # 결과 파일 저장 (특정 경로에 저장, 마지막으로 생성된 콘텐츠)
         output_dir = os.path.dirname(args.output)
         if output_dir and not os.path.exists(output_dir):
             os.makedirs(output_dir, exist_ok=True)
@@ -0,0 +1,239 @@
+import io
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openai")
+
+from hk_catalog import (
+    FolderCatalog,
+    STATUS_FAILED,
+    STATUS_GENERATED,
+    STATUS_GENERATING,
+    STATUS_PENDING,
+)
+from hk_prompt_template import PromptTemplate
+from hk_write_post import (
+    DONE_MARK,
+    PENDING_MARK,
+    SOURCE_FILE_NAME,
+    build_batch_requests,
+    parse_batch_results,
+    run_batch_generation,
+)
+
+
+class FakeBatchClient:
+    """
+    files / batches 엔드포인트만 흉내 내는 가짜 OpenAI 클라이언트.
+
+    제출된 입력 파일을 보관하고, output_lines / error_lines 로 지정한 결과 파일을 돌려줍니다.
+    """
+
+    def __init__(self, status="completed", output_lines=None, error_lines=None):
+        self.status = status
+        self.output_lines = output_lines
+        self.error_lines = error_lines
+        self.file_texts = {}
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve)
+
+    def _create_file(self, file, purpose):
+        file_id = f"file-{len(self.file_texts) + 1}"
+        self.file_texts[file_id] = file.read().decode("utf-8")
+        return SimpleNamespace(id=file_id)
+
+    def _file_content(self, file_id):
+        return SimpleNamespace(text=self.file_texts[file_id])
+
+    def _create_batch(self, input_file_id, endpoint, completion_window):
+        self.input_file_id = input_file_id
+        return SimpleNamespace(id="batch-1")
+
+    def _retrieve(self, batch_id):
+        output_file_id = error_file_id = None
+        if self.output_lines is not None:
+            output_file_id = "file-output"
+            self.file_texts[output_file_id] = "\n".join(self.output_lines)
+        if self.error_lines is not None:
+            error_file_id = "file-error"
+            self.file_texts[error_file_id] = "\n".join(self.error_lines)
+        return SimpleNamespace(
+            id=batch_id,
+            status=self.status,
+            input_file_id=getattr(self, "input_file_id", None),
+            output_file_id=output_file_id,
+            error_file_id=error_file_id,
+        )
+
+
+def success_line(custom_id, content):
+    return json.dumps(
+        {
+            "custom_id": custom_id,
+            "response": {
+                "status_code": 200,
+                "body": {
+                    "choices": [{"message": {"content": content}}],
+                    "usage": {"prompt_tokens": 10, "completion_tokens": 5},
+                },
+            },
+            "error": None,
+        },
+        ensure_ascii=False,
+    )
+
+
+def error_line(custom_id, status_code=500):
+    return json.dumps(
+        {
+            "custom_id": custom_id,
+            "response": {"status_code": status_code, "body": {"error": {"message": "boom"}}},
+            "error": None,
+        }
+    )
+
+
+@pytest.fixture
+def template():
+    return PromptTemplate("system", "요청사항\n${keyword} / ${phone}")
+
+
+@pytest.fixture
+def folders(tmp_path):
+    paths = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / f"{PENDING_MARK}[서울]누수탐지_{name}_1"
+        path.mkdir()
+        (path / SOURCE_FILE_NAME).write_text(f"원문 {name} 010-1111-2222", encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def catalog(tmp_path, folders):
+    with FolderCatalog(str(tmp_path / "catalog.sqlite3")) as catalog:
+        for path in folders:
+            catalog.upsert_folder(path, STATUS_PENDING)
+        yield catalog
+
+
+def statuses(catalog):
+    return {os.path.basename(row["path"]): row["status"] for row in catalog.query(limit=10)}
+
+
+def run(client, folders, template, catalog, tmp_path, **kwargs):
+    return run_batch_generation(
+        folders,
+        template,
+        api_key=None,
+        batch_dir=str(tmp_path / "batches"),
+        poll_interval=0,
+        catalog=catalog,
+        client=client,
+        **kwargs,
+    )
+
+
+def test_build_batch_requests_uses_folder_names_as_custom_ids(folders, template):
+    requests = build_batch_requests(folders, template, "gpt-4o")
+
+    assert [r["custom_id"] for r in requests] == [os.path.basename(f) for f in folders]
+    assert all(r["url"] == "/v1/chat/completions" for r in requests)
+    assert requests[0]["body"]["messages"][1]["content"].startswith("요청사항\n누수탐지")
+
+
+def test_parse_batch_results_skips_error_and_malformed_lines():
+    text = "\n".join(
+        [
+            success_line("a", "본문 a"),
+            error_line("b"),
+            json.dumps({"custom_id": "c", "response": {"status_code": 200, "body": {}}}),
+            "",
+        ]
+    )
+    assert parse_batch_results(text) == {"a": "본문 a"}
+
+
+def test_completed_batch_matches_results_to_folders(folders, template, catalog, tmp_path):
+    a, b, c = (os.path.basename(f) for f in folders)
+    client = FakeBatchClient(
+        output_lines=[success_line(a, "<p>본문</p> 010-1111-2222"), success_line("unknown", "x")],
+        error_lines=[error_line(b)],
+    )
+
+    generated = run(client, folders, template, catalog, tmp_path)
+
+    # 입력 파일에는 세 폴더 모두 제출됨
+    submitted = [json.loads(line)["custom_id"] for line in io.StringIO(client.file_texts["file-1"])]
+    assert submitted == [a, b, c]
+
+    done_path = folders[0].replace(PENDING_MARK, DONE_MARK)
+    assert list(generated) == [folders[0]]
+    with open(os.path.join(done_path, "output.md"), encoding="utf-8") as f:
+        assert f.read() == "본문 010-8678-2065"
+    assert os.path.isdir(folders[1]) and os.path.isdir(folders[2])
+
+    result = statuses(catalog)
+    assert result[os.path.basename(done_path)] == STATUS_GENERATED
+    # 실패 줄(b)과 결과가 없는 요청(c)은 실패로 기록, 알 수 없는 custom_id 는 무시
+    assert result[b] == STATUS_FAILED
+    assert result[c] == STATUS_FAILED
+    assert "unknown" not in result
+
+
+def test_expired_batch_keeps_partial_output(folders, template, catalog, tmp_path):
+    a, b, c = (os.path.basename(f) for f in folders)
+    client = FakeBatchClient(status="expired", output_lines=[success_line(b, "본문 b")])
+
+    generated = run(client, folders, template, catalog, tmp_path)
+
+    assert list(generated) == [folders[1]]
+    result = statuses(catalog)
+    assert result[b.replace(PENDING_MARK, DONE_MARK)] == STATUS_GENERATED
+    assert result[a] == STATUS_FAILED
+    assert result[c] == STATUS_FAILED
+    failed = {row["name"]: row["error"] for row in catalog.query(status=STATUS_FAILED)}
+    assert "expired" in failed[a]
+
+
+def test_resume_reads_submitted_ids_from_input_file(folders, template, catalog, tmp_path):
+    a, b, c = (os.path.basename(f) for f in folders)
+    client = FakeBatchClient(output_lines=[success_line(a, "본문 a")])
+    # 이전 실행에서 a, b 만 제출된 배치
+    client.file_texts["file-input"] = "\n".join(
+        json.dumps({"custom_id": custom_id}) for custom_id in (a, b)
+    )
+    client.input_file_id = "file-input"
+
+    run(client, folders, template, catalog, tmp_path, batch_id="batch-1")
+
+    result = statuses(catalog)
+    assert result[b] == STATUS_FAILED
+    # 이 배치에 제출되지 않은 폴더는 건드리지 않음
+    assert result[c] == STATUS_PENDING
+
+
+def test_timeout_leaves_folders_pending(folders, template, catalog, tmp_path):
+    client = FakeBatchClient(status="in_progress")
+
+    generated = run(client, folders, template, catalog, tmp_path, timeout=0)
+
+    assert generated == {}
+    assert all(os.path.isdir(f) for f in folders)
+    assert set(statuses(catalog).values()) == {STATUS_PENDING}
+
+
+def test_waiting_batch_keeps_claims_fresh(folders, template, catalog, tmp_path):
+    claimed = catalog.claim(limit=3, worker="batch")
+    assert len(claimed) == 3
+    with catalog.transaction() as conn:
+        conn.execute("UPDATE folders SET claimed_at = '2000-01-01T00:00:00'")
+
+    run(FakeBatchClient(status="in_progress"), folders, template, catalog, tmp_path, timeout=0)
+
+    # 배치를 기다리는 동안 claimed_at 이 갱신되어 다른 작업자가 회수하지 않음
+    assert catalog.claim(limit=3, worker="other", stale_after=3600) == []
+    assert set(statuses(catalog).values()) == {STATUS_GENERATING}
@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("pandas")
+
+from hk_fanout import localize_text
+
+
+def test_localize_text_does_not_rewrite_inserted_text():
+    # 하남 -> 남양주 변형본: docs/map.xlsx 의 남양주 주소에 "하남" 이 들어 있어도
+    # 지역명 쌍이 방금 넣은 주소를 다시 바꾸지 않아야 함
+    substitutions = [
+        ("경기 하남시 신장동 520", "경기 하남시 덕풍동 744"),
+        ("하남", "남양주"),
+    ]
+    text = "하남 누수탐지 현장입니다. 주소: 경기 하남시 신장동 520"
+
+    assert localize_text(text, substitutions) == (
+        "남양주 누수탐지 현장입니다. 주소: 경기 하남시 덕풍동 744"
+    )
+
+
+def test_localize_text_prefers_longest_source_and_skips_empty_pairs():
+    substitutions = [("서울", "부산"), ("서울 강남구", "부산 해운대구"), ("", "x"), ("누수", None)]
+
+    assert localize_text("서울 강남구 누수, 서울", substitutions) == "부산 해운대구 누수, 부산"
+    assert localize_text("그대로", []) == "그대로"